@@ -0,0 +1,104 @@
+# Description: Compares per-command parse cost of the compiled CommandParser against the
+# old ordered regex loop as the number of verbs grows.
+# Usage: python -m benchmarks.bench_command_parser [--iterations 20000]
+
+import argparse
+import re
+import timeit
+from engine.command_parser import CommandParser
+
+parser = argparse.ArgumentParser()
+parser.add_argument('--iterations', type=int, default=20000)
+
+BASE_RULES = [
+    ("fast travel to", 'fast_travel_to_world', 'target'),
+    ("move to", 'move_player', 'target'),
+    ("go to", 'move_player', 'target'),
+    ("give", 'handle_give_take', 'transfer', 'to'),
+    ("take", 'handle_give_take', 'transfer', 'from'),
+    ("examine", 'examine_item', 'target'),
+    ("talk to", 'handle_talk_to', 'phrase'),
+    ("speak to", 'handle_talk_to', 'phrase'),
+    ("open", 'handle_open', 'target'),
+    ("close", 'handle_close', 'target'),
+    ("look around", 'simple_command_handler', 'exact'),
+    ("look", 'simple_command_handler', 'exact'),
+    ("whereami", 'simple_command_handler', 'exact'),
+    ("where am i", 'simple_command_handler', 'exact'),
+    ("help", 'simple_command_handler', 'exact'),
+]
+
+BASE_PATTERNS = [
+    r"^(fast travel to) (.+)$",
+    r"^(move to|go to) (.+)$",
+    r"^(give) (\d+) (.+)$",
+    r"^(give) (.+)$",
+    r"^(take) (\d+) (.+)$",
+    r"^(take) (.+)$",
+    r"^(examine) (.+)$",
+    r"^(talk to|speak to) (.+)$",
+    r"^(open|close) (.+)$",
+]
+# Last pattern in the original table; extra verbs are inserted before it
+SIMPLE_PATTERN = r"^(look around|look|whereami|where am i|help)$"
+
+COMMANDS = [
+    "go to mystic market",
+    "give 3 health potion",
+    "take key",
+    "talk to athena",
+    "open chest",
+    "look around",
+    "whereami",
+    "dance wildly",
+]
+
+
+def build_parser(extra_verbs):
+    command_parser = CommandParser(BASE_RULES)
+    for i in range(extra_verbs):
+        command_parser.add_rule(f"verb{i} at", 'extra_handler', 'target')
+    return command_parser
+
+
+def build_patterns(extra_verbs):
+    patterns = BASE_PATTERNS + [rf"^(verb{i} at) (.+)$" for i in range(extra_verbs)] + [SIMPLE_PATTERN]
+    return list(enumerate(patterns))
+
+
+def regex_dispatch(patterns, command):
+    for index, pattern in patterns:
+        match = re.match(pattern, command, re.IGNORECASE)
+        if match:
+            return index, match.groups()
+    return None
+
+
+def main():
+    args = parser.parse_args()
+    print(f"{'verbs':>7} {'regex ns/cmd':>14} {'parser ns/cmd':>14}")
+    for extra_verbs in (0, 10, 100, 1000):
+        command_parser = build_parser(extra_verbs)
+        patterns = build_patterns(extra_verbs)
+
+        def run_parser():
+            for command in COMMANDS:
+                command_parser.parse(command)
+
+        def run_regex():
+            for command in COMMANDS:
+                regex_dispatch(patterns, command)
+
+        # The regex loop gets slow with many verbs, so scale its iterations down
+        regex_iterations = max(1, args.iterations // (1 + extra_verbs))
+        parser_seconds = min(timeit.repeat(run_parser, number=args.iterations, repeat=3))
+        regex_seconds = min(timeit.repeat(run_regex, number=regex_iterations, repeat=3))
+
+        per_command = len(COMMANDS)
+        parser_ns = parser_seconds / (args.iterations * per_command) * 1e9
+        regex_ns = regex_seconds / (regex_iterations * per_command) * 1e9
+        print(f"{len(BASE_RULES) + extra_verbs:>7} {regex_ns:>14.0f} {parser_ns:>14.0f}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,151 @@
+# Description: Replays scripted command mixes through headless game sessions for every world and
+# reports throughput and p50/p95/p99 latency per command type. Results can be stored as a baseline
+# JSON file and later runs compared against it.
+# Usage: python -m benchmarks.bench_engine [--rounds 5] [--save-baseline] [--compare]
+
+import argparse
+import contextlib
+import json
+import os
+import time
+from debug_config import DebugConfig
+from engine.headless import HeadlessGameManager, scratch_directory
+from engine.location_index import LocationIndex
+
+parser = argparse.ArgumentParser()
+parser.add_argument('--worlds', default='OdysseyVR,avalonia,BlizzardWorld', help='Comma separated world keys')
+parser.add_argument('--rounds', type=int, default=5, help='Times each world script is replayed')
+parser.add_argument('--baseline', default=os.path.join(os.path.dirname(__file__), 'baseline_engine.json'))
+parser.add_argument('--save-baseline', action='store_true', help='Write this run to the baseline file')
+parser.add_argument('--compare', action='store_true', help='Compare this run against the baseline file')
+
+# Command prefixes in the order they are matched, and the type each is reported under
+COMMAND_TYPES = [
+    ('fast travel to', 'fast travel'),
+    ('go to', 'move'),
+    ('move to', 'move'),
+    ('look', 'look'),
+    ('whereami', 'whereami'),
+    ('talk to', 'talk'),
+    ('give', 'give'),
+    ('take', 'take'),
+    ('open', 'open'),
+    ('close', 'close'),
+]
+
+
+def command_type(command):
+    for prefix, name in COMMAND_TYPES:
+        if command.startswith(prefix):
+            return name
+    return 'other'
+
+
+def world_script(world_data, other_worlds):
+    """
+    Build a command mix that visits every location, sublocation and room of a world.
+
+    At each stop the player looks around, talks to the NPCs and moves an item in and
+    out of the first container. The script ends with a trip to every other world.
+    """
+    commands = ['look around', 'whereami']
+    index = LocationIndex(world_data)
+    visited = set()
+    for entry in index.entries.values():
+        if id(entry.node) in visited:
+            continue
+        visited.add(id(entry.node))
+        node = entry.node
+        commands += [f"go to {node['name']}", 'look around', 'look', 'whereami']
+        for npc in node.get('npcs', [])[:3]:
+            commands.append(f"talk to {npc['name']}")
+        containers = node.get('containers', [])
+        if containers:
+            name = containers[0]['name']
+            commands += [f"open {name}", 'give 1 health potion', 'take 1 health potion', f"close {name}"]
+    main_entry = next((location['name'] for location in world_data.get('locations', [])
+                       if location.get('main-entry', False)), None)
+    if main_entry:
+        commands.append(f"go to {main_entry}")
+    commands += [f"fast travel to {world}" for world in other_worlds]
+    return commands
+
+
+def percentile(sorted_values, fraction):
+    if not sorted_values:
+        return 0.0
+    position = min(len(sorted_values) - 1, int(round(fraction * (len(sorted_values) - 1))))
+    return sorted_values[position]
+
+
+def summarize(timings):
+    results = {}
+    for name, durations in sorted(timings.items()):
+        durations.sort()
+        total = sum(durations)
+        results[name] = {
+            'count': len(durations),
+            'per_second': round(len(durations) / total if total else 0.0, 1),
+            'p50_us': round(percentile(durations, 0.50) * 1e6, 1),
+            'p95_us': round(percentile(durations, 0.95) * 1e6, 1),
+            'p99_us': round(percentile(durations, 0.99) * 1e6, 1),
+        }
+    return results
+
+
+def run_world(world, worlds, rounds):
+    session = HeadlessGameManager('Benchmark', world)
+    session.add_fast_travel_worlds(worlds)
+    other_worlds = [other for other in worlds if other != world]
+    timings = {}
+    for _ in range(rounds):
+        # Fast travel ends the round in another world, so start each round back at home
+        if session.player_sheet.location['world'] != world:
+            session.run_command(f"fast travel to {world}")
+        for command in world_script(session.world_data, other_worlds):
+            start = time.perf_counter()
+            session.run_command(command)
+            timings.setdefault(command_type(command), []).append(time.perf_counter() - start)
+    session.save_writer.flush()
+    return summarize(timings)
+
+
+def report(results, baseline=None):
+    for world, types in results.items():
+        print(f"{world}:")
+        print(f"  {'type':<12} {'count':>6} {'cmds/s':>10} {'p50 us':>10} {'p95 us':>10} {'p99 us':>10}")
+        for name, stats in types.items():
+            line = (f"  {name:<12} {stats['count']:>6} {stats['per_second']:>10.0f} {stats['p50_us']:>10.1f}"
+                    f" {stats['p95_us']:>10.1f} {stats['p99_us']:>10.1f}")
+            previous = (baseline or {}).get(world, {}).get(name)
+            if previous and previous['p50_us']:
+                line += f"  p50 x{stats['p50_us'] / previous['p50_us']:.2f} vs baseline"
+            print(line)
+
+
+def main():
+    args = parser.parse_args()
+    DebugConfig.set_level('ERROR')
+    worlds = args.worlds.split(',')
+    baseline_path = os.path.abspath(args.baseline)
+
+    baseline = None
+    if args.compare:
+        with open(baseline_path, 'r') as f:
+            baseline = json.load(f)['worlds']
+
+    # Sessions write saves and journals, so run them against a copy of the data
+    # and keep the engine's load and save messages out of the report
+    with scratch_directory(), open(os.devnull, 'w') as devnull, contextlib.redirect_stdout(devnull):
+        results = {world: run_world(world, worlds, args.rounds) for world in worlds}
+
+    report(results, baseline)
+
+    if args.save_baseline:
+        with open(baseline_path, 'w') as f:
+            json.dump({'rounds': args.rounds, 'worlds': results}, f, indent=4)
+        print(f"Baseline written to {baseline_path}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,78 @@
+# Description: Compares the cached normalize_name against the original uncached version on
+# BlizzardWorld's names and on a synthetic world with 100k names.
+# Usage: python -m benchmarks.bench_normalize_name [--synthetic-names 100000]
+
+import argparse
+import json
+import re
+import time
+from debug_config import DebugConfig
+from utilities import normalize_name, normalize_world_names
+
+parser = argparse.ArgumentParser()
+parser.add_argument('--world', default='BlizzardWorld')
+parser.add_argument('--synthetic-names', type=int, default=100000)
+parser.add_argument('--lookups', type=int, default=20, help='Times each name is normalized after loading')
+
+
+def legacy_normalize_name(name):
+    normalized_name = re.sub(r'^the\s+', '', name, flags=re.IGNORECASE)
+    normalized_name = re.sub(r'\s+', ' ', normalized_name).strip().lower()
+    return normalized_name
+
+
+def synthetic_world(name_count):
+    # Ten rooms per sublocation and ten sublocations per location
+    rooms_per_location = 100
+    locations = []
+    for i in range(max(1, name_count // rooms_per_location)):
+        sublocations = []
+        for j in range(10):
+            rooms = [{'name': f"The  Room {i}-{j}-{k}"} for k in range(9)]
+            sublocations.append({'name': f"Sublocation {i}-{j}", 'rooms': rooms})
+        locations.append({'name': f"The Location {i}", 'sublocations': sublocations})
+    return {'name': 'Synthetic World', 'locations': locations}
+
+
+def world_names(world_data):
+    return list(normalize_world_names(world_data))
+
+
+def time_calls(function, names, repeat):
+    start = time.perf_counter()
+    for _ in range(repeat):
+        for name in names:
+            function(name)
+    return time.perf_counter() - start
+
+
+def report(label, world_data, lookups):
+    normalize_name.cache_clear()
+    names = world_names(world_data)
+
+    normalize_name.cache_clear()
+    start = time.perf_counter()
+    normalize_world_names(world_data)
+    bulk_seconds = time.perf_counter() - start
+
+    legacy_seconds = time_calls(legacy_normalize_name, names, lookups)
+    cached_seconds = time_calls(normalize_name, names, lookups)
+    calls = len(names) * lookups
+
+    print(f"{label}: {len(names)} names, {lookups} lookups each")
+    print(f"  bulk load-time pass:   {bulk_seconds * 1000:10.2f} ms")
+    print(f"  legacy normalize_name: {legacy_seconds / calls * 1e9:10.0f} ns/call")
+    print(f"  cached normalize_name: {cached_seconds / calls * 1e9:10.0f} ns/call")
+    print(f"  cache: {normalize_name.cache_info()}")
+
+
+def main():
+    args = parser.parse_args()
+    DebugConfig.set_level('ERROR')
+    with open(f'data/worlds/{args.world}.json', 'r') as f:
+        report(args.world, json.load(f), args.lookups)
+    report("Synthetic", synthetic_world(args.synthetic_names), args.lookups)
+
+
+if __name__ == '__main__':
+    main()
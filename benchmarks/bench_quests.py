@@ -0,0 +1,76 @@
+# Description: Times quest lookups by name, quest class lookups by slug, player quest lookups and
+# quest event handling, on the quests in data/quests.json and on a synthetic quest pack whose
+# quests are all active.
+# Usage: python -m benchmarks.bench_quests [--synthetic-quests 5000] [--lookups 10000]
+
+import argparse
+import contextlib
+import json
+import os
+import time
+from debug_config import DebugConfig
+from engine.event_bus import NPC_SPOKEN_TO
+from engine.headless import HeadlessGameManager, scratch_directory
+from engine.quest_catalog import QuestCatalog
+
+parser = argparse.ArgumentParser()
+parser.add_argument('--synthetic-quests', type=int, default=5000)
+parser.add_argument('--lookups', type=int, default=10000, help='Lookups timed per operation')
+
+
+def synthetic_quests(quest_count):
+    return [{
+        'name': f"Quest {i}",
+        'slug': 'echoesOfAvalonia',
+        'description': f"Synthetic quest {i}.",
+        'isActive': False,
+        'completed': False,
+        'objectives': [{'type': 'speakToCharacter', 'target': f"NPC {i}", 'completed': False}],
+        'rewards': {'tokens': 1},
+    } for i in range(quest_count)]
+
+
+def time_per_call(function, arguments):
+    start = time.perf_counter()
+    for argument in arguments:
+        function(argument)
+    return (time.perf_counter() - start) / len(arguments)
+
+
+def report(label, quests, lookups):
+    with scratch_directory(), open(os.devnull, 'w') as devnull, contextlib.redirect_stdout(devnull):
+        session = HeadlessGameManager('Benchmark')
+        tracker = session.quest_tracker
+
+        start = time.perf_counter()
+        tracker.initial_quests = quests
+        tracker.catalog = QuestCatalog(quests)
+        build = time.perf_counter() - start
+        for quest in quests:
+            tracker.activate_quest(quest['name'])
+
+        # Spread the lookups over the whole pack
+        names = [quests[i * len(quests) // lookups]['name'] for i in range(lookups)]
+        slugs = [quests[i % len(quests)]['slug'] for i in range(lookups)]
+        timings = {
+            'catalog get': time_per_call(tracker.get_quest, names),
+            'class for slug': time_per_call(tracker.quest_class_for_slug, slugs),
+            'player get': time_per_call(session.player_sheet.get_quest, names),
+            'unrelated event': time_per_call(lambda name: session.events.publish(NPC_SPOKEN_TO, 'Nobody'), names),
+        }
+
+    print(f"{label}: {len(quests)} quests, {len(tracker.active_quests)} active, catalog built in {build * 1000:.2f} ms")
+    for name, seconds in timings.items():
+        print(f"  {name:<16} {seconds * 1e6:>8.2f} us")
+
+
+def main():
+    args = parser.parse_args()
+    DebugConfig.set_level('ERROR')
+    with open('data/quests.json', 'r') as f:
+        report('data/quests.json', json.load(f), args.lookups)
+    report('Synthetic', synthetic_quests(args.synthetic_quests), args.lookups)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,59 @@
+# Description: Plays a long session after a save, then measures crash recovery: the size of the
+# command log, what logging costs each command and how long rebuilding the session from the save
+# plus its command log takes.
+# Usage: python -m benchmarks.bench_recovery [--world OdysseyVR] [--commands 10000]
+
+import argparse
+import contextlib
+import os
+import time
+from debug_config import DebugConfig
+from engine.headless import HeadlessGameManager, scratch_directory
+from benchmarks.bench_engine import world_script
+
+parser = argparse.ArgumentParser()
+parser.add_argument('--world', default='OdysseyVR')
+parser.add_argument('--commands', type=int, default=10000, help='Commands played after the save')
+
+
+def play(session, count):
+    # Fast travel saves the game, which empties the command log, so leave it out
+    script = [command for command in world_script(session.world_data, [])
+              if not command.startswith('fast travel')]
+    start = time.perf_counter()
+    for position in range(count):
+        session.run_command(script[position % len(script)])
+    if session.command_log:
+        session.command_log.flush()
+    return time.perf_counter() - start
+
+
+def main():
+    args = parser.parse_args()
+    DebugConfig.set_level('ERROR')
+
+    with scratch_directory(), open(os.devnull, 'w') as devnull, contextlib.redirect_stdout(devnull):
+        session = HeadlessGameManager('Benchmark', args.world)
+        session.save_game()
+        logged = play(session, args.commands)
+        session.save_writer.flush()
+        log_size = os.path.getsize(session.command_log.path)
+
+        start = time.perf_counter()
+        state, unsaved_changes = session.read_save(session.save_path)
+        recovery = time.perf_counter() - start
+        assert state['player_sheet'].get_state() == session.player_sheet.get_state()
+        assert unsaved_changes == session.unsaved_changes
+
+        # The same commands again with logging off, for the overhead
+        session.command_log = None
+        unlogged = play(session, args.commands)
+
+    print(f"{args.world}, {args.commands} commands after the save:")
+    print(f"  command log      {log_size / 1024:>9.1f} KB")
+    print(f"  logging overhead {(logged - unlogged) / args.commands * 1e6:>9.1f} us per command")
+    print(f"  recovery         {recovery * 1000:>9.1f} ms ({len(unsaved_changes)} worlds with unsaved changes)")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,47 @@
+# Description: Compares the save format's section codecs (none, zlib, lzma): file size, save time,
+# full load time and the time to read just the player section, on a state holding a whole world as
+# its overlay, e.g. BlizzardWorld, plus a larger synthetic world.
+# Usage: python -m benchmarks.bench_save_codecs [--world BlizzardWorld] [--synthetic-locations 2000] [--repeat 20]
+
+import argparse
+import json
+from debug_config import DebugConfig
+from engine.save_format import CODECS, SaveReader, decode_game_state, encode_sections
+from engine.world_overlay import world_overlay
+from benchmarks.bench_save_format import player_sheet, synthetic_world, time_call
+
+parser = argparse.ArgumentParser()
+parser.add_argument('--world', default='BlizzardWorld')
+parser.add_argument('--synthetic-locations', type=int, default=2000)
+parser.add_argument('--repeat', type=int, default=20, help='Times each operation is timed')
+
+
+def report(label, world_data, repeat):
+    sections = {
+        'player': player_sheet().get_state(),
+        'overlays': {label: world_overlay(world_data)},
+    }
+
+    print(f"{label}:")
+    print(f"  {'codec':<6} {'size':>10} {'save':>10} {'full load':>10} {'player only':>12}")
+    for codec in CODECS:
+        encoded = encode_sections(sections, codec=codec)
+        assert decode_game_state(encoded)['world_overlays'] == sections['overlays']
+        save = time_call(lambda: encode_sections(sections, codec=codec), repeat)
+        load = time_call(lambda: decode_game_state(encoded), repeat)
+        player_only = time_call(lambda: SaveReader(encoded).section('player'), repeat)
+        print(f"  {codec:<6} {len(encoded) / 1024:>7.1f} KB {save * 1000:>7.2f} ms {load * 1000:>7.2f} ms"
+              f" {player_only * 1000:>9.2f} ms")
+
+
+def main():
+    args = parser.parse_args()
+    DebugConfig.set_level('ERROR')
+    with open(f'data/worlds/{args.world}.json', 'r') as f:
+        report(args.world, json.load(f), args.repeat)
+    report(f"Synthetic ({args.synthetic_locations} locations)", synthetic_world(args.synthetic_locations),
+           max(1, args.repeat // 4))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,88 @@
+# Description: Compares the binary save format against the pickle saves it replaced: file size,
+# save time, full load time and the time to read just the player section. Saves hold world
+# overlays, so each world is saved as an overlay of every node: the worst case, where the player
+# has changed everything.
+# Usage: python -m benchmarks.bench_save_format [--synthetic-locations 2000] [--repeat 20]
+
+import argparse
+import json
+import pickle
+import time
+from debug_config import DebugConfig
+from engine.player_sheet import PlayerSheet
+from engine.save_format import SaveReader, decode_game_state, encode_game_state
+from engine.world_overlay import world_overlay
+
+parser = argparse.ArgumentParser()
+parser.add_argument('--world', default='BlizzardWorld')
+parser.add_argument('--synthetic-locations', type=int, default=2000)
+parser.add_argument('--repeat', type=int, default=20, help='Times each operation is timed')
+
+
+def synthetic_world(location_count):
+    # Every location gets a few NPCs, items and a container, all with repeated names
+    locations = []
+    for i in range(location_count):
+        locations.append({
+            'name': f"Location {i}",
+            'description': f"Location {i} of a generated world, with room for a long description.",
+            'keywords': ['generated', 'busy', 'noisy'],
+            'paths': {'north': f"Location {(i + 1) % location_count}"},
+            'npcs': [{'name': f"Merchant {j}", 'description': 'Sells things.', 'dialog': 'merchant'}
+                     for j in range(5)],
+            'items': [{'name': 'Health Potion', 'quantity': j, 'description': 'Restores health.'}
+                      for j in range(3)],
+            'containers': [{'name': 'Chest', 'isOpen': False, 'inventory': [], 'description': 'A chest.'}],
+        })
+    return {'name': 'Synthetic World', 'locations': locations}
+
+
+def player_sheet():
+    player = PlayerSheet('Benchmark')
+    player.inventory = [{'name': f"Item {i}", 'quantity': i, 'description': 'Loot.'} for i in range(50)]
+    player.quests = [{'name': f"Quest {i}", 'completed': i % 2 == 0, 'isActive': True} for i in range(20)]
+    return player
+
+
+def time_call(function, repeat):
+    start = time.perf_counter()
+    for _ in range(repeat):
+        function()
+    return (time.perf_counter() - start) / repeat
+
+
+def report(label, world_data, repeat):
+    overlays = {label: world_overlay(world_data)}
+    state = {'player_sheet': player_sheet(), 'world_overlays': overlays}
+    pickled = pickle.dumps(state)
+    encoded = encode_game_state(state)
+    assert decode_game_state(encoded)['world_overlays'] == overlays
+
+    rows = [
+        ('size', f"{len(pickled) / 1024:.1f} KB", f"{len(encoded) / 1024:.1f} KB"),
+        ('save', time_call(lambda: pickle.dumps(state), repeat), time_call(lambda: encode_game_state(state), repeat)),
+        ('full load', time_call(lambda: pickle.loads(pickled), repeat), time_call(lambda: decode_game_state(encoded), repeat)),
+        ('player only', time_call(lambda: pickle.loads(pickled)['player_sheet'], repeat),
+         time_call(lambda: SaveReader(encoded).section('player'), repeat)),
+    ]
+
+    print(f"{label}:")
+    print(f"  {'':<12} {'pickle':>12} {'save format':>12}")
+    for name, pickle_value, format_value in rows:
+        if isinstance(pickle_value, float):
+            pickle_value = f"{pickle_value * 1000:.2f} ms"
+            format_value = f"{format_value * 1000:.2f} ms"
+        print(f"  {name:<12} {pickle_value:>12} {format_value:>12}")
+
+
+def main():
+    args = parser.parse_args()
+    DebugConfig.set_level('ERROR')
+    with open(f'data/worlds/{args.world}.json', 'r') as f:
+        report(args.world, json.load(f), args.repeat)
+    report(f"Synthetic ({args.synthetic_locations} locations)", synthetic_world(args.synthetic_locations),
+           max(1, args.repeat // 4))
+
+
+if __name__ == '__main__':
+    main()
@@ -1,6 +1,7 @@
 # debug_config.py
 
 import sys
+import reprlib
 import traceback
 from icecream import ic
 
@@ -15,15 +16,49 @@ class DebugConfig:
     # Default level
     CURRENT_LEVEL = DEBUG_LEVELS['INFO']
 
+    # Trace categories that may emit output; None means all of them
+    TRACE_CATEGORIES = None
+
+    # Longest string a single trace argument is shortened to
+    MAX_TRACE_LENGTH = 300
+
+    TRACERS = {}
+
     @staticmethod
     def set_level(level):
         DebugConfig.CURRENT_LEVEL = DebugConfig.DEBUG_LEVELS.get(level, DebugConfig.CURRENT_LEVEL)
         DebugConfig.configure_icecream()
+        DebugConfig.configure_tracers()
+
+    @staticmethod
+    def set_trace_categories(categories):
+        """Limit trace output to the given categories, e.g. ['world', 'quest']. None enables all."""
+        DebugConfig.TRACE_CATEGORIES = set(categories) if categories is not None else None
+        DebugConfig.configure_tracers()
+
+    @staticmethod
+    def tracer(category):
+        """Return the shared Tracer for a category such as 'world', 'quest', 'ui' or 'ai'."""
+        if category not in DebugConfig.TRACERS:
+            DebugConfig.TRACERS[category] = Tracer(category)
+            DebugConfig.configure_tracers()
+        return DebugConfig.TRACERS[category]
+
+    @staticmethod
+    def configure_tracers():
+        # Like icecream, trace points only print in debug mode (DEBUG and below), warnings and
+        # errors included; there, those at or above the current level fire
+        debug_mode = DebugConfig.CURRENT_LEVEL <= DebugConfig.DEBUG_LEVELS['DEBUG']
+        for category, tracer in DebugConfig.TRACERS.items():
+            if debug_mode and (DebugConfig.TRACE_CATEGORIES is None or category in DebugConfig.TRACE_CATEGORIES):
+                tracer.threshold = DebugConfig.CURRENT_LEVEL
+            else:
+                tracer.threshold = Tracer.DISABLED
 
     @staticmethod
     def configure_icecream():
-        # Configure icecream based on the debug level
-        if DebugConfig.CURRENT_LEVEL >= DebugConfig.DEBUG_LEVELS['DEBUG']:
+        # Configure icecream based on the debug level; like trace points, it only prints at DEBUG and below
+        if DebugConfig.CURRENT_LEVEL <= DebugConfig.DEBUG_LEVELS['DEBUG']:
             ic.enable()
             ic.configureOutput(includeContext=True)
             ic.configureOutput(prefix='DEBUG - ')
@@ -39,8 +74,64 @@ class DebugConfig:
     # def handle_exception(exc_type, exc_value, exc_traceback):
     #     if not issubclass(exc_type, KeyboardInterrupt):
     #         ic("Uncaught exception:", {
-    #             'type': exc_type, 
-    #             'value': exc_value, 
+    #             'type': exc_type,
+    #             'value': exc_value,
     #             'traceback': traceback.format_tb(exc_traceback)
     #         })
 
+
+class Tracer:
+    """
+    Level-gated trace points for one category.
+
+    Messages use %-style placeholders and are only formatted when the trace point
+    fires, so a disabled trace point costs a single comparison. Arguments are
+    shortened with reprlib, which keeps large structures such as world data from
+    flooding the output.
+    """
+    __slots__ = ('category', 'threshold')
+
+    DISABLED = 99
+
+    _repr = reprlib.Repr()
+    _repr.maxstring = DebugConfig.MAX_TRACE_LENGTH
+    _repr.maxother = DebugConfig.MAX_TRACE_LENGTH
+    _repr.maxlist = 10
+    _repr.maxdict = 10
+    _repr.maxlevel = 3
+
+    def __init__(self, category):
+        self.category = category
+        self.threshold = Tracer.DISABLED
+
+    def enabled(self, level='DEBUG'):
+        """Check before building expensive trace arguments."""
+        return self.threshold <= DebugConfig.DEBUG_LEVELS[level]
+
+    def info(self, message, *args):
+        if self.threshold <= 1:
+            self._emit('INFO', message, args)
+
+    def debug(self, message, *args):
+        if self.threshold <= 2:
+            self._emit('DEBUG', message, args)
+
+    def warning(self, message, *args):
+        if self.threshold <= 3:
+            self._emit('WARNING', message, args)
+
+    def error(self, message, *args):
+        if self.threshold <= 4:
+            self._emit('ERROR', message, args)
+
+    def _emit(self, level_name, message, args):
+        if args:
+            message = message % tuple(self._shorten(arg) for arg in args)
+        print(f"{level_name} - [{self.category}] {message}")
+
+    def _shorten(self, arg):
+        if isinstance(arg, str):
+            if len(arg) > DebugConfig.MAX_TRACE_LENGTH:
+                return arg[:DebugConfig.MAX_TRACE_LENGTH] + '...'
+            return arg
+        return self._repr.repr(arg)
@@ -2,10 +2,12 @@
 
 from utilities import normalize_name
 from openai import OpenAI
-from icecream import ic
+from debug_config import DebugConfig
 import json
 import re
 
+trace = DebugConfig.tracer('ai')
+
 class AIAssist:
     def __init__(self, player_sheet, world_builder):
         self.player_sheet = player_sheet
@@ -32,10 +34,10 @@ class AIAssist:
                 frequency_penalty=.7,  # Adjust as needed
                 presence_penalty=.5   # Adjust as needed
             )
-            print(f"AI generated response: {response.choices[0].message.content.strip()}")
+            trace.debug("AI generated response: %s", response.choices[0].message.content.strip())
             return response.choices[0].message.content.strip()
         except Exception as e:
-            ic(f"Error in AI response generation: {e}")
+            trace.error("Error in AI response generation: %s", e)
             return f"I'm having trouble understanding that. {e}"
 
 
@@ -47,14 +49,14 @@ class AIAssist:
         # Step 2: Send command to GPT for interpretation
         interpret_prompt = self.construct_command_context_prompt(command, world_data, player_data)
         interpreted_command = self.generate_ai_response(interpret_prompt)
-        ic(f"Interpreted command: {interpreted_command}")
+        trace.debug("Interpreted command: %s", interpreted_command)
 
         # Step 3: Process the interpreted command to determine the game action
         action_response = self.determine_action_from_interpretation(interpreted_command)
 
         # Step 4: Execute the action and generate a narrative response
-        ic(f"Action response: {action_response}")
-        ic(f"Original command: {command}")
+        trace.debug("Action response: %s", action_response)
+        trace.debug("Original command: %s", command)
         return self.generate_narrative_response(action_response, command)
 
     
@@ -174,9 +176,9 @@ class AIAssist:
         return prompt
     
     def determine_action_from_interpretation(self, interpreted_command):
-        print(f"Determining action from interpreted command: {interpreted_command}")
+        trace.debug("Determining action from interpreted command: %s", interpreted_command)
         command, details, quantity = self.parse_interpreted_command(interpreted_command)
-        print(f"Extracted command: {command}, details: {details}, quantity: {quantity}")
+        trace.debug("Extracted command: %s, details: %s, quantity: %s", command, details, quantity)
 
         if command == "move to":
             return self.world_builder.move_player(details)
@@ -189,7 +191,7 @@ class AIAssist:
 
         elif command in ["take", "give"]:
             details = details.strip("'")
-            return self.world_builder.handle_give_take(command, details)
+            return self.world_builder.handle_give_take(command, quantity, details)
 
         elif command == "examine":
             details = details.strip("'")
@@ -205,9 +207,9 @@ class AIAssist:
 
         elif command == "fast travel to":
             # Strip any extraneous characters like quotes from details
-            ic('fast travel command detected')
+            trace.debug("fast travel command detected")
             world_name = details.strip("'")
-            ic(f'Command: {command}, World name: {world_name}')
+            trace.debug("Command: %s, World name: %s", command, world_name)
             return self.world_builder.fast_travel_to_world(world_name)
 
 
@@ -215,11 +217,11 @@ class AIAssist:
             return self.world_builder.simple_command_handler(command)
 
         else:
-            print(f"Unknown command received: {command}")
+            trace.warning("Unknown command received: %s", command)
             return self.world_builder.display_help()
 
     def parse_interpreted_command(self, interpreted_command):
-        print(f"Extracting command details from: {interpreted_command}")
+        trace.debug("Extracting command details from: %s", interpreted_command)
         
         # Regular expressions to extract Action, Subject, and Quantity
         # Stops at a comma or a newline
@@ -244,21 +246,21 @@ class AIAssist:
         if quantity_match:
             quantity = int(quantity_match.group(1))
 
-        print(f"Extracted Action: {action}, Subject: {subject}, Quantity: {quantity}")
+        trace.debug("Extracted Action: %s, Subject: %s, Quantity: %s", action, subject, quantity)
         return action, subject, quantity
 
         
     def generate_narrative_response(self, action_response, original_command):
-        print(f"Generating narrative response for action: {action_response}, original command: {original_command}")
+        trace.debug("Generating narrative response for action: %s, original command: %s", action_response, original_command)
         player_data = self.player_sheet
         current_location = player_data.location.get("location/sublocation", "Unknown Location")
         location_data = self.world_builder.find_location_data(current_location)
-        print(f"Current location data for narrative: {location_data}")
+        trace.debug("Current location data for narrative: %s", location_data)
 
         prompt = self.construct_narrative_prompt(action_response, original_command, location_data, current_location)
-        print(f"Narrative generation prompt: {prompt}")
+        trace.debug("Narrative generation prompt: %s", prompt)
         narrative_response = self.generate_ai_response(prompt)
-        print(f"Generated narrative response: {narrative_response}")
+        trace.debug("Generated narrative response: %s", narrative_response)
 
         return narrative_response
 
@@ -0,0 +1,146 @@
+# engine/command_log.py
+
+import copy
+import json
+import os
+import time
+from debug_config import DebugConfig
+from engine.save_journal import SaveJournal
+
+trace = DebugConfig.tracer('save')
+
+
+class CommandLog(SaveJournal):
+    """
+    Write-ahead log of the commands played since the last save and what each changed.
+
+    Each record holds the command, the player sheet fields it changed and the
+    location fields it changed per world, so replaying the records over the save
+    rebuilds the session as it was after the last logged command. Fields are
+    compared against what the log last recorded, so a location touched again only
+    logs the fields that differ. Records are
+    buffered and written in batches of BATCH_RECORDS, or sooner once FLUSH_SECONDS
+    have passed, so a crash loses at most one batch. Records are small, many and
+    read back all at once on recovery, so they are stored as plain JSON, which
+    decodes much faster than the save format.
+
+    The log only outlives its session after a crash: loading another save or
+    quitting resets it, so a log with records always belongs to a session that
+    never ended, and is recovered on the next load of its save.
+    """
+
+    BATCH_RECORDS = 32
+    FLUSH_SECONDS = 1.0
+
+    def __init__(self, path, writer=None):
+        super().__init__(path, writer)
+        self.pending = []
+        self.flushed_at = time.monotonic()
+        # The player and location fields as of the last record, which the next record is a delta against
+        self.player_state = None
+        self.location_state = {}
+
+    def start(self, player_sheet):
+        """Track changes to player_sheet from its current state on."""
+        self.player_state = copy.deepcopy(player_sheet.get_state())
+        self.location_state = {}
+
+    def log(self, command, player_sheet, overlays):
+        """Record a command with the {world: {path: fields}} location changes it made."""
+        player = {}
+        for key, value in player_sheet.get_state().items():
+            if self.player_state.get(key) != value:
+                self.player_state[key] = player[key] = copy.deepcopy(value)
+        changed = {}
+        for world_name, changes in overlays.items():
+            logged = self.location_state.setdefault(world_name, {})
+            for path, fields in changes.items():
+                previous = logged.get(path)
+                if previous is not None:
+                    fields_changed = {key: value for key, value in fields.items() if previous.get(key) != value}
+                else:
+                    fields_changed = fields
+                # overlays already hold copies no one changes in place
+                logged[path] = fields
+                if fields_changed:
+                    changed.setdefault(world_name, {})[path] = fields_changed
+        self.pending.append({'command': command, 'player': player, 'overlays': changed})
+        if len(self.pending) >= CommandLog.BATCH_RECORDS or time.monotonic() - self.flushed_at >= CommandLog.FLUSH_SECONDS:
+            self.flush()
+
+    def flush(self):
+        if self.pending:
+            self.extend(self.pending)
+            self.pending = []
+        self.flushed_at = time.monotonic()
+
+    def records(self):
+        self.flush()
+        return super().records()
+
+    def _encode_record(self, record):
+        return json.dumps(record, separators=(',', ':')).encode('utf-8')
+
+    def _decode_records(self, payloads):
+        # One JSON array parses several times faster than a loads() per record
+        return json.loads(b'[' + b','.join(payloads) + b']')
+
+    def has_records(self):
+        """Whether the log holds anything, e.g. records a crashed session left behind."""
+        if self.pending:
+            return True
+        self._wait_for_writer()
+        try:
+            return os.path.getsize(self.path) > 0
+        except FileNotFoundError:
+            return False
+
+    def rebase(self, player_sheet, overlays):
+        """
+        Start a new generation of the log holding just player_sheet and overlays.
+
+        Used once a load has recovered the old records into the session: they are
+        replaced by one record with everything they changed, so a later crash
+        still recovers it but no record is ever replayed twice.
+        """
+        self.reset()
+        self.start(player_sheet)
+        self.location_state = {world_name: {path: dict(fields) for path, fields in changes.items()}
+                               for world_name, changes in overlays.items()}
+        self.pending.append({'command': None, 'player': copy.deepcopy(self.player_state), 'overlays': overlays})
+        self.flush()
+
+    def reset(self):
+        """Drop every record once a save holds their changes, or the session that made them is abandoned."""
+        self.pending = []
+        if self.writer:
+            # Queued behind the save itself, so the log is only emptied once the save is on disk
+            self.writer.replace(self.path, b'')
+        elif os.path.exists(self.path):
+            os.remove(self.path)
+        self.record_count = 0
+
+
+def replay_command_log(state, records):
+    """
+    Apply command log records to a {'player_sheet', 'world_overlays'} state in place.
+
+    Returns the {world: {path: fields}} changes the records made, which no save holds yet.
+    """
+    unsaved = {}
+    player_state = state['player_sheet'].get_state()
+    for record in records:
+        player_state.update(record['player'])
+        for world_name, changes in record['overlays'].items():
+            overlay = state['world_overlays'].setdefault(world_name, {})
+            for path, fields in changes.items():
+                overlay.setdefault(path, {}).update(fields)
+                unsaved.setdefault(world_name, {})[path] = overlay[path]
+    state['player_sheet'].set_state(player_state)
+    if records:
+        trace.debug("Recovered %s commands from the command log", len(records))
+    return unsaved
+
+
+def command_log_path(save_path):
+    return os.path.splitext(save_path)[0] + '.wal'
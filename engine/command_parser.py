@@ -0,0 +1,83 @@
+# engine/command_parser.py
+
+
+class CommandRule:
+    """
+    A single command form, e.g. "go to <target>" or "give [quantity] <item> [to <target>]".
+
+    kind is one of:
+        'target'   - handler(target)
+        'phrase'   - handler(phrase, target)
+        'transfer' - handler(phrase, quantity, item, target); quantity is 1 unless a count
+                     comes first, and target is None unless the preposition follows the item
+        'exact'    - handler(command); the whole command must equal the phrase
+    """
+    __slots__ = ('phrase', 'handler', 'kind', 'preposition')
+
+    def __init__(self, phrase, handler, kind, preposition=None):
+        self.phrase = phrase.lower()
+        self.handler = handler
+        self.kind = kind
+        # Matched with the spaces around it, so it can't be part of an item's name
+        self.preposition = f" {preposition.lower()} " if preposition else None
+
+
+class CommandParser:
+    """
+    Command grammar compiled once into a table keyed by the command's first word.
+
+    A command is parsed by looking up its first word and checking only the few
+    rules that start with it, so the cost of a parse does not grow with the
+    number of verbs. Matching is case-insensitive and the returned arguments keep
+    the casing the player typed.
+    """
+
+    def __init__(self, rules=()):
+        self.rules = {}
+        for rule in rules:
+            self.add_rule(*rule)
+
+    def add_rule(self, phrase, handler, kind='phrase', preposition=None):
+        rule = CommandRule(phrase, handler, kind, preposition)
+        first_word = rule.phrase.split(' ', 1)[0]
+        self.rules.setdefault(first_word, []).append(rule)
+
+    def parse(self, command):
+        """Return (handler, args) for the command, or None if no rule matches."""
+        first_word = command.split(' ', 1)[0].lower()
+        for rule in self.rules.get(first_word, ()):
+            args = self._match(rule, command)
+            if args is not None:
+                return rule.handler, args
+        return None
+
+    def _match(self, rule, command):
+        phrase_length = len(rule.phrase)
+
+        if rule.kind == 'exact':
+            return (command,) if command.lower() == rule.phrase else None
+
+        # The phrase must be followed by a space and a non-empty target
+        if len(command) <= phrase_length + 1 or command[phrase_length] != ' ':
+            return None
+        phrase = command[:phrase_length]
+        if phrase.lower() != rule.phrase:
+            return None
+        target = command[phrase_length + 1:]
+
+        if rule.kind == 'target':
+            return (target,)
+        if rule.kind == 'transfer':
+            return (phrase,) + self._split_transfer(rule, target)
+        return (phrase, target)
+
+    def _split_transfer(self, rule, details):
+        quantity = 1
+        count, separator, rest = details.partition(' ')
+        if separator and rest and count.isdecimal():
+            quantity, details = int(count), rest
+        if rule.preposition:
+            position = details.lower().find(rule.preposition)
+            if position > 0:
+                return quantity, details[:position], details[position + len(rule.preposition):]
+        return quantity, details, None
@@ -0,0 +1,55 @@
+# engine/data_cache.py
+
+import json
+import os
+import pickle
+import threading
+from debug_config import DebugConfig
+
+trace = DebugConfig.tracer('world')
+
+
+class DataCache:
+    """
+    Process-wide cache of parsed JSON data files, keyed by absolute path.
+
+    Each file is read and parsed once and kept as the parsed value plus a pickled
+    snapshot of it. load() hands out a fresh copy from the snapshot, which callers
+    may change freely; load(copy=False) returns the shared value, which they must
+    not. Unpickling copies faster than copy.deepcopy or parsing the file again.
+
+    With hot_reload off a cached file is never touched again, so repeat loads do
+    no file I/O at all. With it on, each load compares the file's mtime and size
+    against the cached ones and re-reads it when they differ.
+    """
+
+    hot_reload = False
+
+    _entries = {}
+    _lock = threading.Lock()
+
+    @classmethod
+    def load(cls, path, copy=True):
+        """Return the parsed contents of a JSON file. Raises what open() and json.load() raise."""
+        path = os.path.abspath(path)
+        entry = cls._entries.get(path)
+        if entry is not None and cls.hot_reload and entry[0] != cls._signature(path):
+            entry = None
+        if entry is None:
+            with cls._lock:
+                signature = cls._signature(path)
+                with open(path, 'r', encoding='utf-8') as f:
+                    value = json.load(f)
+                entry = cls._entries[path] = (signature, value, pickle.dumps(value, pickle.HIGHEST_PROTOCOL))
+                trace.debug("Cached data file %s", path)
+        return pickle.loads(entry[2]) if copy else entry[1]
+
+    @classmethod
+    def clear(cls):
+        with cls._lock:
+            cls._entries.clear()
+
+    @staticmethod
+    def _signature(path):
+        stat = os.stat(path)
+        return (stat.st_mtime_ns, stat.st_size)
@@ -0,0 +1,35 @@
+# engine/entity_index.py
+
+from utilities import normalize_name
+
+
+class EntityIndex:
+    """
+    Normalized name -> entity maps for the NPCs, items and containers of one location.
+
+    open_items covers the 'contains' lists of the location's open containers. Each
+    map keeps the first entity with a given name, matching the linear scans it
+    replaces. WorldBuilder builds one lazily per location and drops it whenever
+    the location's entities or container states change.
+    """
+    __slots__ = ('npcs', 'items', 'containers', 'open_containers', 'open_items', 'targets')
+
+    def __init__(self, location_data):
+        self.npcs = self._by_name(location_data.get('npcs', []))
+        self.items = self._by_name(location_data.get('items', []))
+        self.containers = self._by_name(location_data.get('containers', []))
+        self.open_containers = [container for container in location_data.get('containers', [])
+                                if container.get('isOpen', False)]
+        self.open_items = self._by_name(item for container in self.open_containers
+                                        for item in container.get('contains', []))
+
+        # Interaction targets are searched NPCs first, then items, then containers
+        self.targets = dict(self.containers)
+        self.targets.update(self.items)
+        self.targets.update(self.npcs)
+
+    def _by_name(self, entities):
+        entities_by_name = {}
+        for entity in entities:
+            entities_by_name.setdefault(normalize_name(entity['name']), entity)
+        return entities_by_name
@@ -0,0 +1,59 @@
+# engine/event_bus.py
+
+from collections import namedtuple
+from debug_config import DebugConfig
+from utilities import normalize_name
+
+trace = DebugConfig.tracer('quest')
+
+# Event types published by the engine; an event's target is the name of what it happened to
+EMAIL_READ = 'email read'
+NPC_SPOKEN_TO = 'npc spoken to'
+ITEM_GAINED = 'item gained'
+ITEM_GIVEN = 'item given'
+LOCATION_ENTERED = 'location entered'
+
+Event = namedtuple('Event', ['type', 'target', 'data'])
+
+
+class EventBus:
+    """
+    Synchronous publish/subscribe for game events, keyed by event type and target.
+
+    Handlers subscribe to one target of one event type, or to every target of a
+    type by passing target=None. Targets are compared as normalized names, so
+    'Athena' and 'athena' match. Publishing calls only the handlers for the
+    event's own target plus the type's catch-all handlers, so its cost doesn't
+    grow with the number of subscriptions for other targets.
+    """
+
+    def __init__(self):
+        # (event type, normalized target or None) -> [handler]
+        self.handlers = {}
+
+    def subscribe(self, event_type, target, handler):
+        """Call handler(event) for each matching event. Returns a key for unsubscribe."""
+        key = (event_type, normalize_name(target) if target is not None else None)
+        self.handlers.setdefault(key, []).append(handler)
+        return key, handler
+
+    def unsubscribe(self, subscription):
+        key, handler = subscription
+        handlers = self.handlers.get(key)
+        if handlers and handler in handlers:
+            handlers.remove(handler)
+            if not handlers:
+                del self.handlers[key]
+
+    def publish(self, event_type, target, **data):
+        event = Event(event_type, target, data)
+        # Copied, since a handler may unsubscribe itself or others while the event is handled
+        handlers = list(self.handlers.get((event_type, normalize_name(target)), ()))
+        handlers += self.handlers.get((event_type, None), ())
+        trace.debug("Publishing %s %s to %s handlers", event_type, target, len(handlers))
+        for handler in handlers:
+            handler(event)
+        return event
+
+    def clear(self):
+        self.handlers = {}
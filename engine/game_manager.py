@@ -1,21 +1,63 @@
 # engine/game_manager.py
+import copy
+import os
+import time
+from collections import OrderedDict
+from functools import partial
 from icecream import ic
-from utilities import load_all_worlds, load_working_world_data, load_json, save_game_data, load_game_data
+from debug_config import DebugConfig
+from utilities import load_all_worlds, load_working_world_data, load_json, save_game_data, load_game_data, write_file_atomically
 from interfaces import IGameManager, IQuestTracker, IWorldBuilder, IGameUI
 from engine.player_sheet import PlayerSheet
 from engine.quest_tracker import QuestTracker
+from engine.command_log import CommandLog, command_log_path, replay_command_log
+from engine.event_bus import EventBus, EMAIL_READ
+from engine.save_format import encode_game_state, player_sheet_from_state
+from engine.save_index import SaveIndex
+from engine.save_journal import SaveJournal, save_journal_path
+from engine.save_writer import shared_save_writer
 from engine.world_builder import WorldBuilder
+from engine.world_overlay import apply_location_changes
 from gui.game_ui import GameUI
 from PySide6.QtCore import QObject, Signal, QTimer
 
+trace = DebugConfig.tracer('save')
+# Worlds kept resident are traced with the rest of the world loading
+world_trace = DebugConfig.tracer('world')
+
 class GameManager(QObject, IGameManager):
     display_text_signal = Signal(str)
     gameLoaded = Signal()
+    # A save was loaded into the running session's existing components
+    stateReplaced = Signal()
+
+    # Worlds kept in memory after the player leaves them, so fast travel back needs no reload
+    RESIDENT_WORLDS = 3
 
     def __init__(self, use_ai=False):
         super().__init__() 
         self.use_ai = use_ai
         self.player_sheet = None
+        # After the first full save, later saves append only what changed to a journal
+        self.journal_saves = True
+        self.save_path = None
+        self.save_journal = None
+        # World name -> {location path: fields} for every node changed this session.
+        # A world is its base file plus its overlay; unsaved_changes is the part not yet saved.
+        self.world_overlays = {}
+        self.unsaved_changes = {}
+        # World name -> its live world data, least recently visited first
+        self.resident_worlds = OrderedDict()
+        # Write-ahead log of the commands played since the last save, once there is a save
+        self.command_log = None
+        # Game events, e.g. an email read, that quest objectives subscribe to
+        self.events = EventBus()
+        # Saves are serialized on the calling thread and written to disk on the shared writer thread
+        self.save_writer = shared_save_writer()
+        # Summaries of every save slot, for the Load dialog
+        self.save_index = SaveIndex(writer=self.save_writer)
+        # When play time was last added to the player sheet
+        self.play_clock = None
         ic("GameManager initialized")
 
     def initialize_world_builder(self):
@@ -23,14 +65,56 @@ class GameManager(QObject, IGameManager):
             self.world_builder = WorldBuilder(self.world_data, self.use_ai)
 
     def load_world_data(self, starting_world="OdysseyVR"):
-
-        world_data = load_working_world_data(starting_world)
-
+        # Record the current world's changes before leaving it, so returning restores them
+        self.collect_world_changes()
+        return self.resident_world(starting_world)
+
+    def resident_world(self, world_name):
+        """
+        Return a world's live data, reusing it if it is still resident.
+
+        A resident world holds every change made to it, as its overlay does, so reusing
+        it is the same as rebuilding it. The least recently visited world beyond
+        RESIDENT_WORLDS is dropped; its changes live on in its overlay.
+        """
+        world_data = self.resident_worlds.pop(world_name, None)
+        if world_data is None:
+            world_data = self.build_world_data(world_name)
+        self.resident_worlds[world_name] = world_data
+        while len(self.resident_worlds) > self.RESIDENT_WORLDS:
+            evicted, _ = self.resident_worlds.popitem(last=False)
+            world_trace.debug("World %s is no longer resident", evicted)
         return world_data
 
+    def build_world_data(self, world_name):
+        """Return a world's base data with this session's overlay applied."""
+        world_data = load_working_world_data(world_name)
+        # The overlay stays ours; the world gets its own copy of the fields to mutate
+        return apply_location_changes(world_data, copy.deepcopy(self.world_overlays.get(world_name)))
+
+    def collect_world_changes(self):
+        """Move the nodes changed in the current world into its overlay and return them as {world: changes}."""
+        if not hasattr(self, 'world_builder') or self.player_sheet is None:
+            return {}
+        changes = self.world_builder.take_location_changes()
+        if not changes:
+            return {}
+        world_name = self.player_sheet.location['world']
+        # Copied so later in-place edits to the live world don't leak into the saved overlay
+        changes = copy.deepcopy(changes)
+        self.world_overlays.setdefault(world_name, {}).update(changes)
+        self.unsaved_changes.setdefault(world_name, {}).update(changes)
+        return {world_name: changes}
+
+    def log_command(self, command):
+        """Record a command the world builder accepted, and what it changed, in the command log."""
+        if self.command_log is not None:
+            self.command_log.log(command, self.player_sheet, self.collect_world_changes())
+
     def initialize_game_data(self, player_name):
         ic("Initializing game data")
         self.player_sheet = PlayerSheet(player_name)
+        self.start_play_clock()
 
         # Load world data
         self.world_data = self.load_world_data()
@@ -56,6 +140,9 @@ class GameManager(QObject, IGameManager):
 
     def initialize_quest_tracker(self):
         ic("Initializing quest tracker")
+        # The tracker being replaced must stop handling this session's events
+        if getattr(self, 'quest_tracker', None) is not None:
+            self.quest_tracker.untrack_all_quests()
         self.quest_tracker = QuestTracker()
         self.quest_tracker.set_game_manager(self)
         self.quest_tracker.set_player_sheet(self.player_sheet)
@@ -193,13 +280,6 @@ class GameManager(QObject, IGameManager):
         else:
             ic("Warning: Health Potion not found in global items.")
 
-        # Load the worlds data to create the working world data
-        _world_full_names = load_all_worlds()
-
-        for _world_key, _world_display_name in _world_full_names.items():
-            # Until i can figure out a better way to ensure that all worlds have a working world data file...
-            _single_world_data = load_working_world_data(_world_key)
-
         # Assuming 'Odyssey VR' is the key name for the world in your data structure
         odyssey_vr_key = 'OdysseyVR'  # Adjust if the key is different in your data
 
@@ -313,7 +393,7 @@ class GameManager(QObject, IGameManager):
 
     def get_quest_details(self, quest_name):
         # Attempt to find the quest by name
-        quest_detail = next((quest for quest in self.player_sheet.quests if quest['name'] == quest_name), None)
+        quest_detail = self.player_sheet.get_quest(quest_name)
         ic(f"Quest search for '{quest_name}' found: {quest_detail}")
         
         if quest_detail:
@@ -325,34 +405,192 @@ class GameManager(QObject, IGameManager):
         for email in self.player_sheet.emails:
             if email['name'] == email_name:
                 ic(email)
+                was_unread = not email.get('read', False)
                 email['read'] = True
                 ic(f"Email {email_name} marked as read")
                 ic(email)
-                self.quest_tracker.check_all_quests()
+                self.events.publish(EMAIL_READ, email_name, was_unread=was_unread)
                 self.game_ui.populate_emails()
                 break
 
     def save_game(self):
         # Close all open containers before saving
         self.world_builder.close_all_containers()
+        self.collect_world_changes()
+        self.update_play_time()
+        if self.journal_saves and self.save_journal is not None:
+            self.append_save_record()
+            self.save_index.record(self.save_path, self.player_sheet)
+            self.reset_command_log()
+            return
+
+        # The overlays are the only world data a save needs; the base worlds ship with the game
         state = {
             'player_sheet': self.player_sheet,
-            'world_data': self.world_data  # Include the in-memory world data
+            'world_overlays': self.world_overlays
         }
-        save_game_data(state, f"{self.player_sheet.name}_savegame.pkl")
-        ic(f"State Saved: {state}")
+        filename = f"{self.player_sheet.name}_savegame.sav"
+        size = save_game_data(state, filename, self.save_writer)
+        ic("State Saved")
+
+        # The full save holds every change so far, so start the journal over
+        self.unsaved_changes = {}
+        self.save_path = os.path.join("save_data", filename)
+        self.save_journal = SaveJournal(save_journal_path(self.save_path), self.save_writer)
+        self.save_journal.reset()
+        if size is not None:
+            self.save_index.record(self.save_path, self.player_sheet, size)
+        self.reset_command_log()
+
+    def reset_command_log(self):
+        # The save now holds everything the log did; log from here on
+        if self.command_log is None or self.command_log.path != command_log_path(self.save_path):
+            self.command_log = CommandLog(command_log_path(self.save_path), self.save_writer)
+        self.command_log.reset()
+        self.command_log.start(self.player_sheet)
+
+    def start_play_clock(self):
+        self.play_clock = time.monotonic()
+
+    def update_play_time(self):
+        """Add the time played since the last update to the player sheet."""
+        now = time.monotonic()
+        if self.play_clock is not None and self.player_sheet is not None:
+            self.player_sheet.play_time += now - self.play_clock
+        self.play_clock = now
+
+    def append_save_record(self):
+        changes = self.unsaved_changes
+        self.save_journal.append({'player': self.player_sheet.get_state(), 'overlays': changes})
+        self.unsaved_changes = {}
+
+        if self.save_journal.needs_compaction():
+            # The path is taken now: a load may change save_path while compaction runs
+            self.save_journal.compact_in_background(partial(self.fold_save_journal, self.save_path))
+        if trace.enabled():
+            trace.debug("Journaled save: %s changed locations", sum(len(nodes) for nodes in changes.values()))
+
+    def replay_save_records(self, state, records):
+        """Bring a full save's state up to date with the journal records written after it."""
+        for record in records:
+            for world_name, changes in record['overlays'].items():
+                state['world_overlays'].setdefault(world_name, {}).update(changes)
+            state['player_sheet'] = player_sheet_from_state(record['player'])
+        return state
+
+    def fold_save_journal(self, save_path, records):
+        # Runs on the journal's compaction thread
+        self.save_writer.wait(save_path)
+        state = load_game_data(save_path)
+        if state is None:
+            raise ValueError(f"No full save to compact into at {save_path}")
+        self.replay_save_records(state, records)
+        data = encode_game_state(state)
+        write_file_atomically(save_path, data, temp_suffix='.compact.tmp')
+        self.save_index.record_size(save_path, len(data))
+
+    def read_save(self, filename, recover=True):
+        """
+        Return the state in a save file, brought up to date with its journal and command log.
+
+        Also returns the {world: changes} recovered from the command log, which no save
+        holds yet. With recover off the command log is left out. The state is None if
+        the file can't be read.
+        """
+        # A compaction folds journal records into the full save; read both only once it's done
+        save_journal = SaveJournal(save_journal_path(filename), self.save_writer)
+        save_journal.wait()
+        self.save_writer.wait(filename)
+        state = load_game_data(filename)
+        if not state:
+            return None, {}
+        # Saves made after the last full save are in its journal
+        self.replay_save_records(state, save_journal.records())
+        if not recover:
+            return state, {}
+        # Commands played after the last save, if the game didn't get to save them
+        unsaved_changes = replay_command_log(state, CommandLog(command_log_path(filename), self.save_writer).records())
+        return state, unsaved_changes
+
+    def has_session(self):
+        """Whether a game is running, with a player, world builder, quest tracker and UI to reuse."""
+        return (self.player_sheet is not None and hasattr(self, 'world_builder')
+                and hasattr(self, 'quest_tracker') and getattr(self, 'game_ui', None) is not None)
+
+    def set_loaded_state(self, state, unsaved_changes, filename):
+        # Shared by a first load and an in-place reload; self.player_sheet must already exist
+        self.save_path = filename
+        self.save_journal = SaveJournal(save_journal_path(filename), self.save_writer) if self.journal_saves else None
+
+        self.player_sheet.set_state(state['player_sheet'])
+        self.start_play_clock()
+
+        # Rebuild the player's world from its base file and the saved overlays
+        self.world_overlays = state['world_overlays']
+        self.unsaved_changes = unsaved_changes
+        self.resident_worlds = OrderedDict()
+        self.world_data = self.resident_world(self.player_sheet.location['world'])
+
+        # The previous session's unsaved commands are abandoned with it
+        if self.command_log is not None:
+            self.command_log.reset()
+        self.command_log = CommandLog(command_log_path(filename), self.save_writer)
+        if self.command_log.has_records():
+            # Left by a crash and recovered into unsaved_changes, which aren't saved yet
+            self.command_log.rebase(self.player_sheet, unsaved_changes)
+        else:
+            self.command_log.start(self.player_sheet)
+
+    def end_session(self):
+        """Drop the commands played since the last save, as quitting without saving does."""
+        if self.command_log is not None:
+            self.command_log.reset()
+            self.command_log = None
+        # The writer's thread doesn't outlive the process
+        self.save_writer.flush()
+
+    def replace_state(self, state, unsaved_changes, filename):
+        """
+        Load a save into the running session without rebuilding its components.
+
+        The player sheet, world builder and quest tracker keep their identity and
+        take the save's state, so the UI only has to refresh what it shows; it does
+        that on stateReplaced. Changes the session hadn't saved are dropped, and
+        its command log and the world builder's session state with them.
+        """
+        self.set_loaded_state(state, unsaved_changes, filename)
+        self.world_builder.reset_session()
+        self.world_builder.set_world_data(self.world_data)
+        self.quest_tracker.set_player_sheet(self.player_sheet)
+        self.quest_tracker.initialize_for_new_game()
+        self.stateReplaced.emit()
 
     def load_game(self, filename):
         if filename:
-            # Attempt to load the game state from the provided file
-            state = load_game_data(filename)
+            # The save index is advisory: a mismatch is reported and the save itself decides
+            problem = self.save_index.validate(filename)
+            if problem:
+                trace.warning("Save file doesn't match the save index: %s", problem)
+
+            # Attempt to load the game state from the provided file. The log of the save being
+            # played holds only this session's unsaved commands, which reloading it abandons
+            playing = (self.command_log is not None and
+                       os.path.abspath(self.command_log.path) == os.path.abspath(command_log_path(filename)))
+            state, unsaved_changes = self.read_save(filename, recover=not playing)
             if state:
-                # Initialize PlayerSheet with loaded data
+                if problem:
+                    # The save decoded, so the slot was what was stale
+                    self.save_index.record_size(filename, os.path.getsize(filename))
+                # Mid-session, the save is swapped into the components and UI already built
+                if self.has_session():
+                    self.replace_state(state, unsaved_changes, filename)
+                    trace.debug("Game state replaced. Player: %s, Filename: %s", self.player_sheet.name, filename)
+                    return True
+
                 self.player_sheet = PlayerSheet(state['player_sheet'].name)
-                self.player_sheet.set_state(state['player_sheet'])
+                self.set_loaded_state(state, unsaved_changes, filename)
 
                 # Initialize WorldBuilder with world data
-                self.world_data = state['world_data']
                 self.world_builder = WorldBuilder(world_data=self.world_data, use_ai_assist=self.use_ai)
                 self.world_builder.set_game_manager(self)
 
@@ -0,0 +1,77 @@
+# engine/headless.py
+
+import os
+import shutil
+import tempfile
+from contextlib import contextmanager
+from interfaces import IGameUI
+from engine.game_manager import GameManager
+from engine.player_sheet import PlayerSheet
+from engine.world_builder import WorldBuilder
+
+
+class HeadlessGameManager(GameManager):
+    """
+    A GameManager that runs without a window, for scripts and benchmarks.
+
+    It sets up the same player, world, quests and starting inventory as a new game
+    from the GUI, but uses the no-op IGameUI and never starts a QTimer, so no
+    QApplication or display server is needed. Text the engine emits outside of a
+    command's response, such as travel updates, is collected in messages.
+    """
+
+    def __init__(self, player_name='Player', world='OdysseyVR', use_ai=False):
+        super().__init__(use_ai)
+        self.game_ui = IGameUI()
+        self.messages = []
+        self.player_sheet = PlayerSheet(player_name)
+        self.start_play_clock()
+        self.world_data = self.load_world_data(world)
+        self.world_builder = WorldBuilder(world_data=self.world_data, use_ai_assist=use_ai)
+        self.world_builder.set_game_manager(self)
+        self.world_builder.display_text_signal.connect(self.messages.append)
+        self.display_text_signal.connect(self.messages.append)
+        self.initialize_quest_tracker()
+        self.populate_initial_game_state()
+
+        # New games start in OdysseyVR; anywhere else starts at the world's main entry
+        if world != self.player_sheet.location['world']:
+            main_entry = next((location for location in self.world_data.get('locations', [])
+                               if location.get('main-entry', False)), None)
+            if main_entry:
+                self.player_sheet.location = {"world": world, "location/sublocation": main_entry['name']}
+
+    def add_fast_travel_worlds(self, worlds):
+        """Unlock fast travel to each world's main entry, as finding it in play would."""
+        for world in worlds:
+            world_data = self.build_world_data(world)
+            main_entry = next((location for location in world_data.get('locations', [])
+                               if location.get('main-entry', False)), None)
+            if main_entry:
+                self.player_sheet.add_fast_travel_location(main_entry, world)
+
+    def run_command(self, command):
+        """Run one command and return its response and any text emitted while it ran."""
+        del self.messages[:]
+        response = self.world_builder.incoming_command(command)
+        return response, list(self.messages)
+
+
+@contextmanager
+def scratch_directory(source_directory='.'):
+    """
+    Run in a temporary copy of the game's data directory.
+
+    Sessions write saves and journals relative to the current directory,
+    so scripted runs use a copy to leave the player's own saves untouched.
+    """
+    previous_directory = os.getcwd()
+    scratch = tempfile.mkdtemp(prefix='textadventure_')
+    try:
+        shutil.copytree(os.path.join(source_directory, 'data'), os.path.join(scratch, 'data'),
+                        ignore=shutil.ignore_patterns('working_*'))
+        os.chdir(scratch)
+        yield scratch
+    finally:
+        os.chdir(previous_directory)
+        shutil.rmtree(scratch, ignore_errors=True)
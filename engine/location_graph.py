@@ -0,0 +1,89 @@
+# engine/location_graph.py
+
+from collections import deque
+
+
+class LocationGraph:
+    """
+    Directed graph of the moves a player can make in one world.
+
+    A node links to the destinations in its 'paths', to its sublocations and rooms,
+    and to the rooms of its sublocations, the same places move_player accepts in a
+    single step. Nodes are keyed by their LocationIndex path. Shortest routes are
+    found with a breadth-first search and cached until the graph is rebuilt.
+    The graph is built from each entry's outline, so it never loads a location.
+    """
+
+    def __init__(self, location_index):
+        self.location_index = location_index
+        self.edges = {}
+        self.routes = {}
+        self.built_from = None
+
+    def invalidate(self):
+        """Drop the graph and every cached route; both are rebuilt on the next route()."""
+        self.built_from = None
+
+    def build(self):
+        entries = {}
+        for entry in self.location_index.entries.values():
+            entries[id(entry.outline)] = entry
+
+        edges = {}
+        for entry in entries.values():
+            node = entry.outline
+            neighbours = []
+            for destination in node.get('paths', {}).values():
+                neighbours.append(self.location_index.entries.get(self._key(destination)))
+            for sublocation in node.get('sublocations', []):
+                neighbours.append(entries.get(id(sublocation)))
+                for room in sublocation.get('rooms', []):
+                    neighbours.append(entries.get(id(room)))
+            for room in node.get('rooms', []):
+                neighbours.append(entries.get(id(room)))
+
+            # Paths to places that aren't in the world are skipped
+            edges[entry.path] = [neighbour for neighbour in neighbours
+                                 if neighbour is not None and neighbour.path != entry.path]
+
+        self.edges = edges
+        self.routes = {}
+        self.built_from = self.location_index.builds
+
+    def _key(self, location_name):
+        return self.location_index.key(location_name)
+
+    def route(self, start_name, destination_name):
+        """
+        Return the shortest list of LocationEntries from start to destination, both included,
+        or None if the destination can't be reached.
+        """
+        start = self.location_index.lookup(start_name)
+        destination = self.location_index.lookup(destination_name)
+        if start is None or destination is None:
+            return None
+
+        if self.built_from != self.location_index.builds:
+            self.build()
+
+        route_key = (start.path, destination.path)
+        if route_key not in self.routes:
+            self.routes[route_key] = self._search(start, destination)
+        return self.routes[route_key]
+
+    def _search(self, start, destination):
+        previous = {start.path: None}
+        queue = deque([start])
+        while queue:
+            entry = queue.popleft()
+            if entry.path == destination.path:
+                route = []
+                while entry is not None:
+                    route.append(entry)
+                    entry = previous[entry.path]
+                return route[::-1]
+            for neighbour in self.edges.get(entry.path, []):
+                if neighbour.path not in previous:
+                    previous[neighbour.path] = entry
+                    queue.append(neighbour)
+        return None
@@ -0,0 +1,207 @@
+# engine/location_index.py
+
+from utilities import normalize_name
+from engine.world_store import CHILD_KEYS, LazyLocations
+
+
+class LocationEntry:
+    """A node in the world tree together with the chain of nodes above it."""
+    __slots__ = ('node', 'parents', 'path')
+
+    # The node is in memory; LazyLocationEntry is the one that may not be
+    loaded = True
+
+    def __init__(self, node, parents, path):
+        self.node = node
+        self.parents = parents
+        self.path = path
+
+    @property
+    def outline(self):
+        return self.node
+
+
+class LazyLocationEntry:
+    """
+    A LocationEntry for a node of a LazyLocations world, found by position.
+
+    outline is available without loading anything; reading node or parents loads
+    the node's top-level location.
+    """
+    __slots__ = ('locations', 'position', 'route', 'outline', 'path')
+
+    def __init__(self, locations, position, route, outline, path):
+        self.locations = locations
+        self.position = position
+        self.route = route
+        self.outline = outline
+        self.path = path
+
+    @property
+    def loaded(self):
+        return self.locations.is_loaded(self.position)
+
+    @property
+    def node(self):
+        return self._chain()[-1]
+
+    @property
+    def parents(self):
+        return tuple(self._chain()[:-1])
+
+    def _chain(self):
+        node = self.locations[self.position]
+        chain = [node]
+        for key, child in zip(CHILD_KEYS, self.route):
+            node = node[key][child]
+            chain.append(node)
+        return chain
+
+
+class LocationIndex:
+    """
+    Maps normalized location names to their nodes in a world's data.
+
+    Locations, sublocations and rooms are indexed by their own name. Sublocations
+    and rooms are also indexed by their "parent/child" path, which is the form
+    move_player stores in the player's location. When two nodes share a name the
+    first one in world order wins, matching the original linear search.
+    """
+
+    def __init__(self, world_data=None):
+        self.entries = {}
+        self.paths = {}
+        # Position -> LazyLocations for the locations indexed from their outline
+        self.unloaded = {}
+        self.stale = True
+        self.builds = 0
+        # Keys that didn't resolve, and whether a location changed since the index was built
+        self.misses = set()
+        self.changed = False
+        self.world_data = world_data
+        if world_data is not None:
+            self.build(world_data)
+
+    def build(self, world_data):
+        entries = {}
+        locations = world_data.get('locations', [])
+        self.unloaded = {}
+        if isinstance(locations, LazyLocations):
+            # Locations that haven't loaded are indexed from their outline and load on first use
+            for position in range(len(locations)):
+                if locations.is_loaded(position):
+                    self._add_location(entries, locations[position], _loaded_entry)
+                else:
+                    self.unloaded[position] = locations
+                    self._add_location(entries, locations.outline(position), self._lazy_entry(locations, position))
+        else:
+            for location in locations:
+                self._add_location(entries, location, _loaded_entry)
+
+        self.entries = entries
+        self.paths = {}
+        for entry in entries.values():
+            if entry.loaded:
+                self.paths.setdefault(id(entry.node), entry.path)
+        self.world_data = world_data
+        self.stale = False
+        self.misses = set()
+        self.changed = False
+        self.builds += 1
+
+    def _add_location(self, entries, location, make_entry):
+        if not isinstance(location, dict) or 'name' not in location:
+            return
+        location_name = location['name']
+        self._add(entries, location_name, make_entry(location, (), location_name, ()))
+        for i, sublocation in enumerate(location.get('sublocations', [])):
+            sublocation_name = sublocation['name']
+            entry = make_entry(sublocation, (location,), sublocation_name, (i,))
+            self._add(entries, sublocation_name, entry)
+            self._add(entries, f"{location_name}/{sublocation_name}", entry)
+            for j, room in enumerate(sublocation.get('rooms', [])):
+                room_path = f"{sublocation_name}/{room['name']}"
+                entry = make_entry(room, (location, sublocation), room_path, (i, j))
+                self._add(entries, room['name'], entry)
+                self._add(entries, room_path, entry)
+
+    def _lazy_entry(self, locations, position):
+        def make_entry(outline, parents, path, route):
+            return LazyLocationEntry(locations, position, route, outline, path)
+        return make_entry
+
+    def key(self, location_name):
+        """Return the index key for a location name or "parent/child" path."""
+        return normalize_name(location_name)
+
+    def _add(self, entries, name, entry):
+        # Keep the first occurrence so lookups resolve the same node as a linear scan
+        entries.setdefault(self.key(name), entry)
+
+    def invalidate(self):
+        """Mark the index as out of date; it is rebuilt on the next lookup."""
+        self.stale = True
+        self.misses = set()
+
+    def note_change(self):
+        """
+        Record that a location changed in place, e.g. was renamed or gained a room.
+
+        Keys that missed before may resolve now, so the next miss rebuilds the index.
+        """
+        self.changed = True
+        self.misses = set()
+
+    def lookup(self, location_name):
+        """Return the LocationEntry for a location name or "parent/child" path, or None."""
+        if self.stale and self.world_data is not None:
+            self.build(self.world_data)
+
+        key = self.key(location_name)
+        entry = self.entries.get(key)
+        if entry is not None and not self._is_current(entry, key):
+            # A node was renamed or moved since the index was built
+            self.build(self.world_data)
+            entry = self.entries.get(key)
+        if entry is None and self.world_data is not None:
+            if key in self.misses:
+                return None
+            if self.changed:
+                # The name may belong to a location added or renamed since the build
+                self.build(self.world_data)
+                entry = self.entries.get(key)
+            if entry is None:
+                self.misses.add(key)
+        return entry
+
+    def path_of(self, node):
+        """Return the path a node is indexed under, or None if it isn't in the world."""
+        if self.stale and self.world_data is not None:
+            self.build(self.world_data)
+        path = self.paths.get(id(node))
+        if path is None and self.unloaded:
+            self._add_loaded_paths()
+            path = self.paths.get(id(node))
+        return path
+
+    def _add_loaded_paths(self):
+        # Record the nodes of locations that have loaded since the index was built
+        loaded = {position for position, locations in self.unloaded.items() if locations.is_loaded(position)}
+        if not loaded:
+            return
+        for position in loaded:
+            del self.unloaded[position]
+        for entry in self.entries.values():
+            if isinstance(entry, LazyLocationEntry) and entry.position in loaded:
+                self.paths.setdefault(id(entry.node), entry.path)
+
+    def _is_current(self, entry, key):
+        # Nothing can rename a node that hasn't loaded
+        if not entry.loaded:
+            return True
+        names = [parent['name'] for parent in entry.parents] + [entry.node.get('name', '')]
+        return key == normalize_name(names[-1]) or key == normalize_name('/'.join(names[-2:]))
+
+
+def _loaded_entry(node, parents, path, route):
+    return LocationEntry(node, parents, path)
@@ -16,6 +16,8 @@ class PlayerSheet:
         self.notes = []
         self.emails = []
         self.tokens = 25
+        # Seconds played across every session of this save
+        self.play_time = 0.0
         ic("Player sheet initialized")
 
     @property
@@ -40,6 +42,7 @@ class PlayerSheet:
         self.notes = []
         self.emails = []
         self.tokens = 25
+        self.play_time = 0.0
         ic("Player state has been reset for a new game.")
 
     def add_item(self, item):
@@ -88,22 +91,23 @@ class PlayerSheet:
         ic(quest)
         if isinstance(quest, dict) and 'name' in quest:
             # Check if the quest is already active to prevent duplicates
-            if quest['name'] not in [q['name'] for q in self.quests]:
+            positions = self.quest_positions()
+            if quest['name'] not in positions:
+                positions[quest['name']] = len(self.quests)
                 self.quests.append(quest)
         else:
             raise ValueError('The quest must be a dictionary with a "name" key.')
         
     def update_quest(self, updated_quest):
-        for i, quest in enumerate(self.quests):
-            if quest['name'] == updated_quest['name']:
-                self.quests[i] = updated_quest
-                ic(f"Updated quest: {updated_quest['name']}")
-                break
+        position = self.quest_positions().get(updated_quest['name'])
+        if position is not None:
+            self.quests[position] = updated_quest
+            ic(f"Updated quest: {updated_quest['name']}")
 
     def complete_quest(self, quest_name, quest_tracker):
         ic("Completing quest")
         ic(quest_name)
-        quest = next((q for q in self.quests if q['name'] == quest_name), None)
+        quest = self.get_quest(quest_name)
         if quest:
             quest['completed'] = True
             quest_tracker.update_quest_data(quest)
@@ -170,18 +174,41 @@ class PlayerSheet:
             'quests': self.quests,
             'notes': self.notes,
             'emails': self.emails,
-            'tokens': self.tokens
+            'tokens': self.tokens,
+            'play_time': self.play_time
         }
 
     def set_state(self, state):
         if isinstance(state, PlayerSheet):
             self.__dict__.update(state.__dict__)
+        elif isinstance(state, dict):
+            # The shape get_state returns, e.g. from a save file
+            self.name = state.get('name', self.name)
+            self.inventory = state.get('inventory', [])
+            self._location = state.get('location', self._location)
+            self.fast_travel_locations = state.get('fast_travel_locations', [])
+            self.quests = state.get('quests', [])
+            self.notes = state.get('notes', [])
+            self.emails = state.get('emails', [])
+            self.tokens = state.get('tokens', self.tokens)
+            self.play_time = state.get('play_time', 0.0)
         else:
-            raise TypeError("state must be an instance of PlayerSheet")
+            raise TypeError("state must be a PlayerSheet or a dict from get_state")
 
     def get_quest(self, quest_name):
         ic(f"Getting quest: {quest_name}")
-        return next((quest for quest in self.quests if quest['name'] == quest_name), None)
+        position = self.quest_positions().get(quest_name)
+        return self.quests[position] if position is not None else None
+
+    def quest_positions(self):
+        """Return {quest name: position in quests}, rebuilt whenever quests is replaced, e.g. by set_state."""
+        # Sheets unpickled from old saves predate the index
+        if getattr(self, '_indexed_quests', None) is not self.quests:
+            self._quest_positions = {}
+            for position, quest in enumerate(self.quests):
+                self._quest_positions.setdefault(quest['name'], position)
+            self._indexed_quests = self.quests
+        return self._quest_positions
 
     def get_all_quests(self):
         ic("Getting all quests")
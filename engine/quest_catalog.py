@@ -0,0 +1,34 @@
+# engine/quest_catalog.py
+
+from debug_config import DebugConfig
+
+trace = DebugConfig.tracer('quest')
+
+
+class QuestCatalog:
+    """
+    The quests from data/quests.json, indexed by name.
+
+    QuestTracker looks quests up by name to activate them, so the catalog keeps
+    them in a dict and get() costs the same however many quests there are.
+    Finding the quests an event matters to is the event bus's job: each active
+    objective subscribes to its own events. The catalog holds the quest dicts it
+    was built from.
+    """
+
+    def __init__(self, quests):
+        self.quests = quests
+        self.by_name = {}
+        for quest in quests:
+            # The first definition of a name wins, as the old linear search did
+            self.by_name.setdefault(quest['name'], quest)
+        trace.debug("Quest catalog built with %s quests", len(quests))
+
+    def __len__(self):
+        return len(self.quests)
+
+    def __iter__(self):
+        return iter(self.quests)
+
+    def get(self, quest_name):
+        return self.by_name.get(quest_name)
@@ -1,17 +1,36 @@
 # engine/quest_tracker.py
 
-import json
-from icecream import ic
+from functools import partial
+from debug_config import DebugConfig
+from engine.data_cache import DataCache
+from engine.event_bus import EMAIL_READ, NPC_SPOKEN_TO, ITEM_GAINED, ITEM_GIVEN
+from engine.quest_catalog import QuestCatalog
 from interfaces import IGameManager, IQuestTracker, IPlayerSheet
 from utilities import normalize_name
 
+trace = DebugConfig.tracer('quest')
+
 class QuestTracker(IQuestTracker):
+    """
+    Activates quests and completes them as the player meets their objectives.
+
+    Each active quest is built once, and each of its unfinished objectives
+    subscribes to the game events that can complete it on the GameManager's
+    event bus, e.g. the NPC a speakToCharacter objective names being spoken to.
+    An event only re-evaluates the objectives subscribed to it, however many
+    quests are active.
+    """
+
     def __init__(self):
         self.game_manager = None  # To be set later
+        self.player_sheet = None
+        # Quest name -> BaseQuest, for the player's active quests
+        self.active_quests = {}
 
-        ic("Initializing quest tracker")
+        trace.debug("Initializing quest tracker")
         
         self.initial_quests = self.load_initial_quests()
+        self.catalog = QuestCatalog(self.initial_quests)
 
     def set_game_manager(self, game_manager: IGameManager):
         if game_manager is None:
@@ -20,34 +39,37 @@ class QuestTracker(IQuestTracker):
 
     def set_player_sheet(self, player_sheet: IPlayerSheet):
         self.player_sheet = player_sheet
+        self.track_active_quests()
 
     def load_initial_quests(self):
         try:
-            with open('data/quests.json', 'r') as f:
-                return json.load(f)
+            # A fresh copy each time, as activating a quest changes its data
+            return DataCache.load('data/quests.json')
         except Exception as e:
-            ic(f"Error loading quests: {e}")
+            trace.error("Error loading quests: %s", e)
             return []
 
     def initialize_for_new_game(self):
         # Initialize or reset quests for a new game
         self.initial_quests = self.load_initial_quests() 
-        ic("Quest tracker initialized for a new game.")
+        self.catalog = QuestCatalog(self.initial_quests)
+        trace.debug("Quest tracker initialized for a new game.")
 
     def get_quest(self, quest_name):
-        return next((quest for quest in self.initial_quests if quest['name'] == quest_name), None)
+        return self.catalog.get(quest_name)
 
 
     def activate_quest(self, quest_name):
         if not self.player_sheet:
-            ic("Player sheet not set in QuestTracker")
+            trace.debug("Player sheet not set in QuestTracker")
             return
         else:
             quest_data = self.get_quest(quest_name)
             if quest_data and not quest_data.get('completed', False):
                 quest_data['isActive'] = True
                 self.player_sheet.add_quest(quest_data)  # Assuming add_quest is a method in PlayerSheet
-                ic(f"Quest {quest_name} activated") 
+                self.track_quest(quest_data)
+                trace.debug("Quest %s activated", quest_name) 
 
     def initialize_quest(self, quest_slug, quest_data):
         quest_class = self.quest_class_for_slug(quest_slug)
@@ -57,37 +79,87 @@ class QuestTracker(IQuestTracker):
             raise ValueError(f"No quest class found for slug: {quest_slug}")
 
     def quest_class_for_slug(self, quest_slug):
-        quest_classes = {
-            'initialQuest': initialQuest,
-            'echoesOfAvalonia': echoesOfAvalonia,  # Make sure this matches the slug in your JSON
-            'the-hidden-knowledge': TheHiddenKnowledge,
-            'royal-decrees': RoyalDecrees,
-            'guardian-of-the-realms': GuardianOfTheRealms
-        }
-        return quest_classes.get(quest_slug)
+        return QUEST_CLASSES.get(quest_slug)
+
+    def track_active_quests(self):
+        """Track the player sheet's active quests, e.g. after a game was loaded, dropping any tracked before."""
+        self.untrack_all_quests()
+        if self.game_manager is None or self.player_sheet is None:
+            return
+        for quest_data in self.player_sheet.quests:
+            self.track_quest(quest_data)
+
+    def track_quest(self, quest_data):
+        """Build an active quest and subscribe its unfinished objectives to the events that can complete them."""
+        if quest_data.get('completed') or not quest_data.get('isActive') or quest_data['name'] in self.active_quests:
+            return
+        quest_class = self.quest_class_for_slug(quest_data['slug'])
+        if not quest_class:
+            trace.debug("No quest class for %s, not tracking it", quest_data['slug'])
+            return
+        quest = quest_class(self.game_manager, quest_data)
+        self.active_quests[quest_data['name']] = quest
+        # Objectives the player already meets, e.g. items already held, have no event to wait for
+        if self.check_quest(quest):
+            self.complete_quest(quest)
+            return
+        for objective in quest.objectives:
+            if not objective.completed:
+                handler = partial(self.handle_objective_event, quest, objective)
+                objective.subscriptions = [self.game_manager.events.subscribe(event_type, target, handler)
+                                           for event_type, target in objective.events()]
+        trace.debug("Tracking quest %s", quest_data['name'])
+
+    def untrack_objective(self, objective):
+        for subscription in objective.subscriptions:
+            self.game_manager.events.unsubscribe(subscription)
+        objective.subscriptions = []
+
+    def untrack_all_quests(self):
+        for quest in self.active_quests.values():
+            for objective in quest.objectives:
+                self.untrack_objective(objective)
+        self.active_quests = {}
+
+    def handle_objective_event(self, quest, objective, event):
+        if objective.completed or not objective.handle_event(event):
+            return
+        trace.debug("Objective %s of quest %s met by %s", objective.objective_data['type'], quest.quest_data['name'], event)
+        self.untrack_objective(objective)
+        if all(obj.completed for obj in quest.objectives):
+            self.complete_quest(quest)
+
+    def check_quest(self, quest):
+        """Complete the objectives of a quest the current game state already meets; returns whether all are."""
+        for objective in quest.objectives:
+            if not objective.completed and objective.check_objective():
+                objective.complete()
+                self.untrack_objective(objective)
+        return all(objective.completed for objective in quest.objectives)
+
+    def complete_quest(self, quest):
+        quest_data = quest.quest_data
+        self.active_quests.pop(quest_data['name'], None)
+        for objective in quest.objectives:
+            self.untrack_objective(objective)
+        quest.complete()
+        self.player_sheet.update_quest(quest_data)
+        # A quest tracked while a game is loading can complete before its UI exists
+        if getattr(self.game_manager, 'game_ui', None) is not None:
+            self.game_manager.game_ui.update_quest_log()
+        trace.debug("Quest %s marked completed in player sheet", quest_data['name'])
 
     def check_all_quests(self):
-        ic("Checking all quests")
+        """Re-check every objective of every active quest, for state that changed without an event."""
+        trace.debug("Checking all quests")
         if self.game_manager is None:
             raise RuntimeError("GameManager is not set in QuestTracker")
+        # Quests added to the player sheet directly aren't tracked yet
         for quest_data in self.player_sheet.quests:
-            ic(f"Quest data before check: {quest_data}")
-            if not quest_data['completed'] and quest_data['isActive']:
-                ic("Checking quest")
-                ic(quest_data)
-                quest_class = self.quest_class_for_slug(quest_data['slug'])
-                ic(quest_class)
-                if quest_class:
-                    ic("Checking objectives for quest:", quest_data['name'])
-                    quest_object = quest_class(self.game_manager, quest_data)
-                    ic(quest_object)
-                    objectives_completed = quest_object.check_objectives()
-                    ic(f"Objectives completed for quest {quest_data['name']}:", objectives_completed)
-                    if objectives_completed:
-                        quest_data['completed'] = True
-                        self.player_sheet.update_quest(quest_data)
-                        self.game_manager.game_ui.update_quest_log()
-                        ic(f"Quest {quest_data['name']} marked completed in player sheet")
+            self.track_quest(quest_data)
+        for quest in list(self.active_quests.values()):
+            if self.check_quest(quest):
+                self.complete_quest(quest)
 
 # Base class for all objectives
 class BaseObjective:
@@ -95,7 +167,33 @@ class BaseObjective:
         self.game_manager = game_manager
         self.objective_data = objective_data
         self.completed = objective_data.get('completed', False)
-        ic(self.objective_data)
+        # Event bus subscriptions held while the objective is unfinished
+        self.subscriptions = []
+        # Counters live in the objective's data, so they are saved with the quest and restored as they were
+        if not self.completed and 'progress' not in objective_data:
+            progress = self.start_progress()
+            if progress is not None:
+                objective_data['progress'] = progress
+        trace.debug("Objective data: %s", self.objective_data)
+
+    @property
+    def progress(self):
+        return self.objective_data.get('progress')
+
+    def start_progress(self):
+        """Return the counters a newly started objective tracks, taken once from the current game state."""
+        return None
+
+    def events(self):
+        """Return the (event type, target) pairs that can complete this objective; a None target matches any."""
+        return []
+
+    def handle_event(self, event):
+        """Re-evaluate the objective after an event it subscribed to; returns whether it is now complete."""
+        if self.check_objective():
+            self.complete()
+            return True
+        return False
 
     def check_objectives(self):
         for objective in self.objectives:
@@ -104,12 +202,48 @@ class BaseObjective:
         return True
 
     def complete(self):
-        ic(f"Completing objective: {self.objective_data}")
+        trace.debug("Completing objective: %s", self.objective_data)
         self.completed = True
         self.objective_data['completed'] = True
 
 # Objective for reading email(s)
 class ReadEmailObjective(BaseObjective):
+    def events(self):
+        target = self.objective_data['target']
+        if target == "all-unread":
+            return [(EMAIL_READ, None)]
+        elif isinstance(target, list):
+            return [(EMAIL_READ, email_name) for email_name in target]
+        return [(EMAIL_READ, target)]
+
+    def start_progress(self):
+        target = self.objective_data['target']
+        if target == "all-unread":
+            emails = self.game_manager.player_sheet.get_all_emails()
+            return {'unread_remaining': sum(1 for email in emails if not email.get('read', False))}
+        targets = target if isinstance(target, list) else [target]
+        return {'unread': [email_name for email_name in targets if not self.check_specific_email_read(email_name)]}
+
+    def handle_event(self, event):
+        # Counted down as emails are read, rather than rescanning the inbox
+        progress = self.progress
+        if 'unread_remaining' in progress:
+            if event.data.get('was_unread', True):
+                progress['unread_remaining'] = max(0, progress['unread_remaining'] - 1)
+            if progress['unread_remaining'] == 0:
+                # Mail that arrived after the count was taken isn't in it, so recount before completing
+                emails = self.game_manager.player_sheet.get_all_emails()
+                progress['unread_remaining'] = sum(1 for email in emails if not email.get('read', False))
+            remaining = progress['unread_remaining']
+        else:
+            read = normalize_name(event.target)
+            progress['unread'] = [name for name in progress['unread'] if normalize_name(name) != read]
+            remaining = len(progress['unread'])
+        if remaining == 0:
+            self.complete()
+            return True
+        return False
+
     def check_objective(self):
         # Handle the case where all items should be checked
         if self.objective_data['target'] == "all-unread":
@@ -137,27 +271,43 @@ class ReadEmailObjective(BaseObjective):
         return False
 
 class SpeakToCharacterObjective(BaseObjective):
+    def events(self):
+        return [(NPC_SPOKEN_TO, self.objective_data['target'])]
+
+    def handle_event(self, event):
+        # Subscribed to the target NPC only, so being spoken to is the objective met
+        trace.debug("Spoke to %s, completing objective", event.target)
+        self.complete()
+        return True
+
     def check_objective(self):
-        ic("Checking speak to character objective")
-        # Normalize the target NPC name and last spoken NPC name
-        target = self.objective_data['target']
-        ic(f'Objective data: {target}')
-        last_spoken_npc = self.game_manager.world_builder.last_spoken_npc
-        ic(f'Last spoken NPC: {last_spoken_npc}')
-        target_npc_name = normalize_name(self.objective_data['target'])
-        last_spoken_npc = normalize_name(self.game_manager.world_builder.last_spoken_npc)
-        
-        ic(f'Normalized Target NPC name: {target_npc_name}')
-        ic(f'Normalized Last spoken NPC: {last_spoken_npc}')
-        
-        if last_spoken_npc == target_npc_name:
-            ic("Objective met, completing objective")
+        # A talk happens only as an event; no saved state records it, so there is nothing to re-check
+        return self.completed
+
+class CollectObjective(BaseObjective):
+    def events(self):
+        return [(ITEM_GAINED, self.objective_data['target'])]
+
+    def start_progress(self):
+        # What the player already holds counts towards the amount, and may already meet it
+        held = self.held_quantity()
+        if held >= self.objective_data.get('amount', 1):
+            self.complete()
+        return {'collected': held}
+
+    def held_quantity(self):
+        target = normalize_name(self.objective_data['target'])
+        return sum(item.get('quantity', 1) for item in self.game_manager.player_sheet.inventory
+                   if normalize_name(item['name']) == target)
+
+    def handle_event(self, event):
+        progress = self.progress
+        progress['collected'] += event.data.get('quantity', 1)
+        if progress['collected'] >= self.objective_data.get('amount', 1):
             self.complete()
             return True
-        ic("Objective not met")
         return False
- 
-class CollectObjective(BaseObjective):
+
     def check_objective(self):
         target_type = self.objective_data.get('targetType', 'item')  # Assuming 'item' as default
 
@@ -166,13 +316,13 @@ class CollectObjective(BaseObjective):
         elif target_type == 'resource':
             return self.check_resource_collected()
         else:
-            ic(f"Unknown target type: {target_type}")
+            trace.warning("Unknown target type: %s", target_type)
             return False
 
     def check_item_collected(self):
-        item = self.game_manager.player_sheet.get_inventory_item_details(self.objective_data['target'])
-        ic(item)
-        if item:
+        held = self.held_quantity()
+        trace.debug("Collected %s of item %s", held, self.objective_data['target'])
+        if held >= self.objective_data.get('amount', 1):
             self.complete()
             return True
         return False
@@ -187,9 +337,25 @@ class CollectObjective(BaseObjective):
         return False
     
 class GiveItemObjective(BaseObjective):
+    def events(self):
+        return [(ITEM_GIVEN, self.objective_data['target'])]
+
+    def start_progress(self):
+        return {'given': 0}
+
+    def handle_event(self, event):
+        # Giving the item away is the objective, so it's counted from the events rather than the inventory
+        progress = self.progress
+        progress['given'] += event.data.get('quantity', 1)
+        if progress['given'] >= self.objective_data.get('amount', 1):
+            self.complete()
+            return True
+        return False
+
     def check_objective(self):
-        item = self.game_manager.player_sheet.get_inventory_item_details(self.objective_data['target'])
-        if item:
+        # Holding the item doesn't count; only what was given, which the events have counted
+        progress = self.progress
+        if progress is not None and progress['given'] >= self.objective_data.get('amount', 1):
             self.complete()
             return True
         return False
@@ -199,9 +365,9 @@ class BaseQuest:
     def __init__(self, game_manager, quest_data):
         self.game_manager = game_manager
         self.quest_data = quest_data
-        ic(self.quest_data)
+        trace.debug("Quest data: %s", self.quest_data)
         self.objectives = [self._create_objective(obj_data) for obj_data in quest_data['objectives']]
-        ic(self.objectives)
+        trace.debug("Objectives: %s", self.objectives)
 
     def _create_objective(self, objective_data):
         objective_type = objective_data['type']
@@ -218,28 +384,29 @@ class BaseQuest:
         
     def check_objectives(self):
         all_objectives_completed = all(obj.check_objective() for obj in self.objectives)
-        ic(f"All objectives completed for quest '{self.quest_data['name']}': {all_objectives_completed}")
+        trace.debug("All objectives completed for quest '%s': %s", self.quest_data['name'], all_objectives_completed)
         if all_objectives_completed:
             self.complete()  
             return True
         return False
 
     def complete(self):
-        ic(f"Completing quest: {self.quest_data['name']}")
+        trace.debug("Completing quest: %s", self.quest_data['name'])
         self.quest_data['completed'] = True
         self.distribute_rewards()
-        ic(f"Quest completed: {self.quest_data}")
+        trace.debug("Quest completed: %s", self.quest_data)
 
     def distribute_rewards(self):
         rewards = self.quest_data.get('rewards', {})
         if 'items' in rewards:
             for item in rewards['items']:
                 self.game_manager.player_sheet.add_item(item)
+                self.game_manager.events.publish(ITEM_GAINED, item['name'], quantity=item.get('quantity', 1))
         if 'experience' in rewards:
             self.game_manager.player_sheet.add_experience(rewards['experience'])
         if 'tokens' in rewards:
             self.game_manager.player_sheet.add_tokens(rewards['tokens'])
-        ic(f"Rewards distributed for quest: {self.quest_data['name']}")
+        trace.debug("Rewards distributed for quest: %s", self.quest_data['name'])
             
 ## Individual quests go here
 
@@ -283,4 +450,14 @@ class GuardianOfTheRealms(BaseQuest):
         super().__init__(game_manager, quest_data)
 
     def check_objectives(self):
-        return super().check_objectives()
\ No newline at end of file
+        return super().check_objectives()
+
+
+# Quest slug -> quest class, used by QuestTracker.quest_class_for_slug
+QUEST_CLASSES = {
+    'initialQuest': initialQuest,
+    'echoesOfAvalonia': echoesOfAvalonia,  # Make sure this matches the slug in your JSON
+    'the-hidden-knowledge': TheHiddenKnowledge,
+    'royal-decrees': RoyalDecrees,
+    'guardian-of-the-realms': GuardianOfTheRealms
+}
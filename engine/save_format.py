@@ -0,0 +1,347 @@
+# engine/save_format.py
+
+import lzma
+import pickle
+import struct
+import zlib
+from debug_config import DebugConfig
+from engine.player_sheet import PlayerSheet
+
+trace = DebugConfig.tracer('save')
+
+# Bump when the layout of a section changes, and add a migration from the previous version
+SAVE_FORMAT_VERSION = 3
+
+MAGIC = b'TAS\x00'
+
+# Older pickle saves are read through migrate_pickle_state; turn off to refuse them. Only files
+# with the legacy extension are ever unpickled, anything else without MAGIC is refused
+ALLOW_PICKLE_SAVES = True
+PICKLE_SAVE_EXTENSION = '.pkl'
+
+# Codec name -> (id stored in the file, compress, decompress). Each section is compressed
+# on its own, so reading one section still leaves the others untouched.
+CODECS = {
+    'none': (0, bytes, bytes),
+    # Level 1: saves are compressed on the game's thread, and higher levels cost 3x the time for ~12% less
+    'zlib': (1, lambda data: zlib.compress(data, 1), zlib.decompress),
+    'lzma': (2, lzma.compress, lzma.decompress),
+}
+_CODECS_BY_ID = {codec_id: decompress for codec_id, _, decompress in CODECS.values()}
+
+# Codec new saves and journal records are written with; any codec in CODECS can be read
+SAVE_CODEC = 'zlib'
+
+# Value tags. Strings, counts and ints have narrow variants so the common small cases take few bytes
+(_NONE, _TRUE, _FALSE, _INT8, _INT, _FLOAT, _STR8, _STR16, _STR,
+ _LIST8, _LIST, _DICT8, _DICT) = range(13)
+
+_HEADER = struct.Struct('<4sHH')
+_SECTION = struct.Struct('<HII')
+_U16 = struct.Struct('<H')
+_U32 = struct.Struct('<I')
+_I8 = struct.Struct('<b')
+_I64 = struct.Struct('<q')
+_F64 = struct.Struct('<d')
+
+
+class SaveFormatError(ValueError):
+    pass
+
+
+def encode_sections(sections, version=SAVE_FORMAT_VERSION, codec=None):
+    """
+    Encode a {section name: value} map as a save file.
+
+    Values may be None, bools, ints, floats, strings, lists and dicts with string
+    keys, i.e. anything the JSON world data holds. Each section carries its own
+    table of the distinct strings in it, so a name repeated across the world is
+    stored once and a section can be decoded without touching the others.
+    From version 3 each section is compressed with codec (default SAVE_CODEC)
+    behind a byte naming the codec.
+    """
+    names = list(sections)
+    payloads = [_encode_section(sections[name]) for name in names]
+    if version >= 3:
+        codec_id, compress, _ = CODECS[codec or SAVE_CODEC]
+        payloads = [bytes((codec_id,)) + compress(payload) for payload in payloads]
+
+    header = bytearray(_HEADER.pack(MAGIC, version, len(names)))
+    encoded_names = [name.encode('utf-8') for name in names]
+    offset = len(header) + sum(_SECTION.size + len(name) for name in encoded_names)
+    for name, payload in zip(encoded_names, payloads):
+        header += _SECTION.pack(len(name), offset, len(payload)) + name
+        offset += len(payload)
+    return bytes(header) + b''.join(payloads)
+
+
+def _encode_section(value):
+    strings = {}
+    body = bytearray()
+    _encode_value(value, body, strings)
+
+    blob = '\x00'.join(strings).encode('utf-8')
+    return _U32.pack(len(strings)) + _U32.pack(len(blob)) + blob + bytes(body)
+
+
+def _encode_value(value, out, strings):
+    # Checked by exact type, most common first; subclasses fall through to the slower checks below
+    value_type = type(value)
+    if value_type is str:
+        _encode_string(value, out, strings)
+    elif value_type is dict:
+        _encode_count(len(value), _DICT8, _DICT, out)
+        for key, item in value.items():
+            if type(key) is not str:
+                raise SaveFormatError(f"Save data keys must be strings, not {key!r}")
+            _encode_string(key, out, strings)
+            _encode_value(item, out, strings)
+    elif value_type is list or value_type is tuple:
+        _encode_count(len(value), _LIST8, _LIST, out)
+        for item in value:
+            _encode_value(item, out, strings)
+    elif value is None:
+        out.append(_NONE)
+    elif value is True:
+        out.append(_TRUE)
+    elif value is False:
+        out.append(_FALSE)
+    elif value_type is int:
+        if -128 <= value < 128:
+            out.append(_INT8)
+            out += _I8.pack(value)
+        else:
+            out.append(_INT)
+            out += _I64.pack(value)
+    elif value_type is float:
+        out.append(_FLOAT)
+        out += _F64.pack(value)
+    elif isinstance(value, (str, dict, list, int, float)):
+        # Subclasses such as OrderedDict are saved as their base type
+        base = next(base for base in (str, dict, list, int, float) if isinstance(value, base))
+        _encode_value(base(value), out, strings)
+    elif isinstance(value, tuple):
+        _encode_value(list(value), out, strings)
+    else:
+        raise SaveFormatError(f"Cannot save a value of type {type(value).__name__}")
+
+
+def _encode_string(value, out, strings):
+    string_id = strings.get(value)
+    if string_id is None:
+        if '\x00' in value:
+            raise SaveFormatError("Save data strings can't contain NUL characters")
+        string_id = strings[value] = len(strings)
+    if string_id < 0x100:
+        out.append(_STR8)
+        out.append(string_id)
+    elif string_id < 0x10000:
+        out.append(_STR16)
+        out += _U16.pack(string_id)
+    else:
+        out.append(_STR)
+        out += _U32.pack(string_id)
+
+
+def _encode_count(count, narrow_tag, wide_tag, out):
+    if count < 0x100:
+        out.append(narrow_tag)
+        out.append(count)
+    else:
+        out.append(wide_tag)
+        out += _U32.pack(count)
+
+
+class SaveReader:
+    """
+    Reads a save file's header up front and decodes each section on first use.
+
+    Sections written by an older format version are passed through the migrations
+    in SECTION_MIGRATIONS before they are returned.
+    """
+
+    def __init__(self, data):
+        if not is_save_format(data):
+            raise SaveFormatError("Not a save file")
+        _, self.version, section_count = _HEADER.unpack_from(data, 0)
+        if self.version > SAVE_FORMAT_VERSION:
+            raise SaveFormatError(f"Save format {self.version} is newer than this game ({SAVE_FORMAT_VERSION})")
+
+        self.data = data
+        self.spans = {}
+        self.decoded = {}
+        offset = _HEADER.size
+        for _ in range(section_count):
+            name_length, section_offset, section_length = _SECTION.unpack_from(data, offset)
+            offset += _SECTION.size
+            name = data[offset:offset + name_length].decode('utf-8')
+            offset += name_length
+            self.spans[name] = (section_offset, section_length)
+
+    def section_names(self):
+        return list(self.spans)
+
+    def section(self, name, default=None):
+        if name not in self.spans:
+            return default
+        if name not in self.decoded:
+            offset, length = self.spans[name]
+            payload = memoryview(self.data)[offset:offset + length]
+            if self.version >= 3:
+                # Only this section is decompressed, straight from the file's buffer
+                decompress = _CODECS_BY_ID.get(payload[0])
+                if decompress is None:
+                    raise SaveFormatError(f"Unknown codec {payload[0]} in section {name}")
+                payload = decompress(payload[1:])
+            value = _decode_section(payload)
+            for version in range(self.version, SAVE_FORMAT_VERSION):
+                value = SECTION_MIGRATIONS[version](name, value)
+            self.decoded[name] = value
+        return self.decoded[name]
+
+
+def _decode_section(data):
+    string_count, = _U32.unpack_from(data, 0)
+    blob_length, = _U32.unpack_from(data, 4)
+    body_offset = 8 + blob_length
+    strings = bytes(data[8:body_offset]).decode('utf-8').split('\x00') if string_count else []
+    # Decoded in place from a decompressed section; a raw section is copied out of the file once
+    if not isinstance(data, bytes):
+        data = bytes(data)
+
+    unpack_u16 = _U16.unpack_from
+    unpack_u32 = _U32.unpack_from
+    unpack_i8 = _I8.unpack_from
+    unpack_i64 = _I64.unpack_from
+    unpack_f64 = _F64.unpack_from
+
+    def decode(offset):
+        tag = data[offset]
+        offset += 1
+        if tag == _STR8:
+            return strings[data[offset]], offset + 1
+        if tag == _DICT8 or tag == _DICT:
+            if tag == _DICT8:
+                count = data[offset]
+                offset += 1
+            else:
+                count, = unpack_u32(data, offset)
+                offset += 4
+            result = {}
+            for _ in range(count):
+                key, offset = decode(offset)
+                result[key], offset = decode(offset)
+            return result, offset
+        if tag == _LIST8 or tag == _LIST:
+            if tag == _LIST8:
+                count = data[offset]
+                offset += 1
+            else:
+                count, = unpack_u32(data, offset)
+                offset += 4
+            result = []
+            for _ in range(count):
+                item, offset = decode(offset)
+                result.append(item)
+            return result, offset
+        if tag == _STR16:
+            return strings[unpack_u16(data, offset)[0]], offset + 2
+        if tag == _STR:
+            return strings[unpack_u32(data, offset)[0]], offset + 4
+        if tag == _INT8:
+            return unpack_i8(data, offset)[0], offset + 1
+        if tag == _INT:
+            return unpack_i64(data, offset)[0], offset + 8
+        if tag == _NONE:
+            return None, offset
+        if tag == _TRUE:
+            return True, offset
+        if tag == _FALSE:
+            return False, offset
+        if tag == _FLOAT:
+            return unpack_f64(data, offset)[0], offset + 8
+        raise SaveFormatError(f"Unknown value tag {tag}")
+
+    return decode(body_offset)[0]
+
+
+# Version n -> function(section name, value) returning the value in version n + 1's layout.
+# Version 1 saved the player's whole world as 'world'; version 2 saves 'overlays' instead,
+# which decode_game_state derives from an old 'world' section.
+SECTION_MIGRATIONS = {
+    1: lambda name, value: value,
+    # Version 3 compresses sections; their values are unchanged
+    2: lambda name, value: value,
+}
+
+
+def is_save_format(data):
+    return data[:len(MAGIC)] == MAGIC
+
+
+def encode_game_state(state):
+    """Encode a {'player_sheet': PlayerSheet, 'world_overlays': {world: overlay}} game state."""
+    return encode_sections({
+        'player': state['player_sheet'].get_state(),
+        'overlays': state['world_overlays'],
+    })
+
+
+def decode_game_state(data, allow_pickle=False):
+    """
+    Decode a save file into a {'player_sheet': PlayerSheet, 'world_overlays': {world: overlay}} game state.
+
+    Data without the save format header is migrated as a pickle save only if allow_pickle
+    is set, which load_game_data does for files named like the old pickle saves.
+    """
+    if not is_save_format(data):
+        if not allow_pickle:
+            raise SaveFormatError("Not a save file")
+        return migrate_pickle_state(data)
+    reader = SaveReader(data)
+    player_sheet = player_sheet_from_state(reader.section('player'))
+    overlays = reader.section('overlays')
+    if overlays is None:
+        # A version 1 save holds the whole world; as an overlay it replaces every node's fields
+        overlays = _whole_world_overlays(player_sheet, reader.section('world'))
+    return {'player_sheet': player_sheet, 'world_overlays': overlays}
+
+
+def _whole_world_overlays(player_sheet, world_data):
+    # Imported here: world_overlay reaches utilities, which imports this module
+    from engine.world_overlay import world_overlay
+    location = player_sheet.location
+    if not world_data or not isinstance(location, dict) or 'world' not in location:
+        return {}
+    return {location['world']: world_overlay(world_data)}
+
+
+def player_sheet_from_state(state):
+    """Build a PlayerSheet from a get_state() dict or an older PlayerSheet."""
+    name = state['name'] if isinstance(state, dict) else state.name
+    player_sheet = PlayerSheet(name)
+    player_sheet.set_state(state)
+    return player_sheet
+
+
+def migrate_pickle_state(data):
+    """
+    Read a save written before the binary format, when saves were raw pickles.
+
+    Unpickling runs arbitrary code, so only load pickles the player wrote themselves:
+    only .pkl files get here, and ALLOW_PICKLE_SAVES = False refuses those too. The next save rewrites the file in the
+    current format.
+    """
+    if not ALLOW_PICKLE_SAVES:
+        raise SaveFormatError("Pickle saves are disabled")
+    trace.warning("Migrating a pickle save to save format %s", SAVE_FORMAT_VERSION)
+    state = pickle.loads(data)
+    player_sheet = state['player_sheet']
+    if not isinstance(player_sheet, PlayerSheet):
+        raise SaveFormatError("Pickle save has no player sheet")
+    # A fresh sheet supplies defaults for any attribute added since the pickle was written
+    player_sheet = player_sheet_from_state(player_sheet)
+    return {
+        'player_sheet': player_sheet,
+        'world_overlays': _whole_world_overlays(player_sheet, state['world_data']),
+    }
@@ -0,0 +1,164 @@
+# engine/save_index.py
+
+import json
+import os
+import threading
+import time
+from debug_config import DebugConfig
+from engine.save_format import SaveReader, SaveFormatError
+
+trace = DebugConfig.tracer('save')
+
+SAVE_DIRECTORY = 'save_data'
+INDEX_FILENAME = 'save_index.json'
+
+
+class SaveIndex:
+    """
+    Summary of every save slot in save_data, kept in save_data/save_index.json.
+
+    Each slot is keyed by its save file name and records the player, world,
+    location, play time, save file size and the time of the last save, so the
+    Load dialog can list slots without decoding any of them. GameManager updates
+    a slot on every save, journaled or full. A .sav file the index doesn't know
+    is added by reading just its player section; entries whose file is gone are
+    dropped. Given a SaveWriter, the index file is written on its thread.
+    """
+
+    def __init__(self, directory=SAVE_DIRECTORY, writer=None):
+        self.directory = directory
+        self.path = os.path.join(directory, INDEX_FILENAME)
+        self.writer = writer
+        self.lock = threading.Lock()
+        self.slots = None
+
+    def _load(self, reload=False):
+        # Reloading picks up slots written by other GameManagers, e.g. before a Load Game
+        if self.slots is not None and not reload:
+            return
+        if self.writer:
+            self.writer.wait(self.path)
+        try:
+            with open(self.path, 'r') as f:
+                self.slots = json.load(f)
+        except FileNotFoundError:
+            self.slots = {}
+        except (ValueError, OSError) as e:
+            trace.warning("Rebuilding unreadable save index %s: %s", self.path, e)
+            self.slots = {}
+
+    def list_slots(self):
+        """Return [(save path, slot)] for every save, most recently saved first."""
+        with self.lock:
+            self._load(reload=True)
+            changed = self._reconcile()
+            slots = sorted(self.slots.items(), key=lambda item: item[1]['saved_at'], reverse=True)
+            if changed:
+                self._write()
+        return [(os.path.join(self.directory, filename), dict(slot)) for filename, slot in slots]
+
+    def _reconcile(self):
+        try:
+            filenames = {name for name in os.listdir(self.directory) if name.endswith('.sav')}
+        except FileNotFoundError:
+            filenames = set()
+        changed = False
+        for filename in list(self.slots):
+            if filename not in filenames:
+                del self.slots[filename]
+                changed = True
+        for filename in filenames - self.slots.keys():
+            slot = self._read_slot(os.path.join(self.directory, filename))
+            if slot is not None:
+                self.slots[filename] = slot
+                changed = True
+        return changed
+
+    def _read_slot(self, path):
+        # For saves written before the index existed; only the player section is decoded
+        try:
+            with open(path, 'rb') as f:
+                data = f.read()
+            player = SaveReader(data).section('player') or {}
+        except (OSError, SaveFormatError) as e:
+            trace.warning("Can't index save %s: %s", path, e)
+            return None
+        location = player.get('location') or {}
+        return {
+            'player': player.get('name'),
+            'world': location.get('world'),
+            'location': location.get('location/sublocation'),
+            'play_time': player.get('play_time', 0),
+            'size': len(data),
+            'saved_at': os.path.getmtime(path),
+        }
+
+    def record(self, save_path, player_sheet, size=None):
+        """Update a slot after its player was saved; size is the full save's length when it was rewritten."""
+        filename = os.path.basename(save_path)
+        location = player_sheet.location
+        with self.lock:
+            self._load()
+            slot = self.slots.setdefault(filename, {'size': 0})
+            slot.update({
+                'player': player_sheet.name,
+                'world': location.get('world'),
+                'location': location.get('location/sublocation'),
+                'play_time': player_sheet.play_time,
+                'saved_at': time.time(),
+            })
+            if size is not None:
+                slot['size'] = size
+            self._write()
+
+    def record_size(self, save_path, size):
+        """Update a slot's size after its full save was rewritten, e.g. by journal compaction."""
+        with self.lock:
+            self._load()
+            slot = self.slots.get(os.path.basename(save_path))
+            if slot is not None:
+                slot['size'] = size
+                self._write()
+
+    def validate(self, save_path):
+        """
+        Check a save file against its slot before it is decoded.
+
+        Returns None when the file matches, or a description of the mismatch. The
+        index is only a summary and may lag the file, e.g. after a crash before the
+        index was written, so a mismatch is a warning and not a reason to refuse
+        the save. Saves the index has no slot for pass.
+        """
+        if self.writer:
+            self.writer.wait(save_path)
+        with self.lock:
+            self._load(reload=True)
+            slot = self.slots.get(os.path.basename(save_path))
+        if slot is None or os.path.dirname(os.path.abspath(save_path)) != os.path.abspath(self.directory):
+            return None
+        try:
+            size = os.path.getsize(save_path)
+        except OSError as e:
+            return str(e)
+        if size != slot['size']:
+            return f"{save_path} is {size} bytes but was saved as {slot['size']}"
+        return None
+
+    def _write(self):
+        data = json.dumps(self.slots, indent=2).encode('utf-8')
+        if self.writer:
+            self.writer.replace(self.path, data)
+        else:
+            os.makedirs(self.directory, exist_ok=True)
+            temp_path = f"{self.path}.tmp"
+            with open(temp_path, 'wb') as f:
+                f.write(data)
+            os.replace(temp_path, self.path)
+
+
+def format_slot(slot):
+    """Describe a slot in one line for the Load dialog."""
+    minutes = int(slot.get('play_time', 0)) // 60
+    saved_at = time.strftime('%Y-%m-%d %H:%M', time.localtime(slot['saved_at']))
+    return (f"{slot.get('player')} - {slot.get('location')} ({slot.get('world')}) - "
+            f"{minutes // 60}h {minutes % 60:02d}m played - {saved_at} - {slot['size'] / 1024:.0f} KB")
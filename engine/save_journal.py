@@ -0,0 +1,173 @@
+# engine/save_journal.py
+
+import os
+import struct
+import threading
+from debug_config import DebugConfig
+from engine.save_format import SaveReader, encode_sections
+
+trace = DebugConfig.tracer('save')
+
+_HEADER = struct.Struct('>I')
+
+
+class SaveJournal:
+    """
+    Append-only log of save records kept next to a full save file.
+
+    Each record is a {section: value} map stored in the save format behind a
+    length prefix, so a record cut short by a crash is dropped on read and the
+    records before it still load. Records hold whole node and player states rather
+    than deltas, which makes replaying one twice harmless.
+    Compaction relies on that: it folds the records into the full save on a
+    background thread and then drops them, keeping anything appended meanwhile.
+    Given a SaveWriter, appends are written on its thread and reads wait for them.
+    """
+
+    # Records a journal may hold before it is compacted
+    COMPACT_RECORDS = 50
+
+    # One lock per journal file, shared by every SaveJournal opened on it, and the compaction
+    # last started on each file, so a journal opened later still waits for one an older journal began
+    _locks = {}
+    _compactions = {}
+    _locks_lock = threading.Lock()
+
+    def __init__(self, path, writer=None, codec=None):
+        self.path = path
+        self.writer = writer
+        self.codec = codec
+        self.key = os.path.abspath(path)
+        with SaveJournal._locks_lock:
+            self.lock = SaveJournal._locks.setdefault(self.key, threading.Lock())
+        self.record_count = None
+
+    @property
+    def compaction(self):
+        return SaveJournal._compactions.get(self.key)
+
+    def append(self, record):
+        self.extend([record])
+
+    def extend(self, records):
+        """Append several records in one write."""
+        data = b''.join(_HEADER.pack(len(encoded)) + encoded
+                        for encoded in (self._encode_record(record) for record in records))
+        if self.record_count is None:
+            self.wait()
+            self._wait_for_writer()
+            with self.lock:
+                self.record_count = len(self._read()[0])
+        if self.writer:
+            self.writer.append(self.path, data, self.lock)
+        else:
+            with self.lock:
+                with open(self.path, 'ab') as f:
+                    f.write(data)
+        self.record_count += len(records)
+        trace.debug("Appended %s bytes to %s", len(data), self.path)
+
+    def records(self):
+        self.wait()
+        self._wait_for_writer()
+        with self.lock:
+            return self._read()[0]
+
+    def _wait_for_writer(self):
+        # The writer takes self.lock to append, so never wait for it while holding the lock
+        if self.writer:
+            self.writer.wait(self.path)
+
+    def _read(self):
+        # Returns the complete records and the offset just past the last of them
+        try:
+            with open(self.path, 'rb') as f:
+                data = f.read()
+        except FileNotFoundError:
+            return [], 0
+
+        payloads = []
+        offset = 0
+        while offset + _HEADER.size <= len(data):
+            (length,) = _HEADER.unpack_from(data, offset)
+            end = offset + _HEADER.size + length
+            if end > len(data):
+                trace.warning("Ignoring a partial record at the end of %s", self.path)
+                break
+            payloads.append(data[offset + _HEADER.size:end])
+            offset = end
+        return self._decode_records(payloads), offset
+
+    def _encode_record(self, record):
+        return encode_sections(record, codec=self.codec)
+
+    def _decode_records(self, payloads):
+        records = []
+        for payload in payloads:
+            reader = SaveReader(payload)
+            records.append({name: reader.section(name) for name in reader.section_names()})
+        return records
+
+    def reset(self):
+        """Drop every record, e.g. after a full save made them redundant."""
+        self.wait()
+        self._wait_for_writer()
+        with self.lock:
+            if os.path.exists(self.path):
+                os.remove(self.path)
+        self.record_count = 0
+
+    def needs_compaction(self):
+        return self.record_count is not None and self.record_count >= SaveJournal.COMPACT_RECORDS
+
+    def compact_in_background(self, fold):
+        """
+        Fold the current records into the full save on a daemon thread.
+
+        fold(records) must replace the full save atomically. Does nothing while a
+        previous compaction of the same file is still running, whichever journal started it.
+        """
+        with SaveJournal._locks_lock:
+            compaction = SaveJournal._compactions.get(self.key)
+            if compaction is not None and compaction.is_alive():
+                return compaction
+            compaction = threading.Thread(target=self._compact, args=(fold,), daemon=True)
+            SaveJournal._compactions[self.key] = compaction
+            # Started under the lock, so no one can join it before it runs
+            compaction.start()
+        return compaction
+
+    def _compact(self, fold):
+        self._wait_for_writer()
+        with self.lock:
+            records, offset = self._read()
+        if not records:
+            return
+
+        try:
+            fold(records)
+        except Exception as e:
+            trace.error("Compacting %s failed: %s", self.path, e)
+            return
+
+        # Keep whatever was appended while fold ran
+        with self.lock:
+            with open(self.path, 'rb') as f:
+                tail = f.read()[offset:]
+            # Not '.tmp', which the save writer may be using for the same file
+            temp_path = self.path + '.compact.tmp'
+            with open(temp_path, 'wb') as f:
+                f.write(tail)
+            os.replace(temp_path, self.path)
+            self.record_count = len(self._read()[0])
+        trace.debug("Compacted %s records from %s", len(records), self.path)
+
+    def wait(self):
+        """Block until a running compaction of this journal's file finishes."""
+        compaction = self.compaction
+        if compaction is not None and compaction is not threading.current_thread():
+            compaction.join()
+
+
+def save_journal_path(save_path):
+    return os.path.splitext(save_path)[0] + '.journal'
@@ -0,0 +1,109 @@
+# engine/save_writer.py
+
+import atexit
+import os
+import threading
+from collections import OrderedDict
+from contextlib import nullcontext
+from debug_config import DebugConfig
+
+trace = DebugConfig.tracer('save')
+
+
+class SaveWriter:
+    """
+    Writes save files on a background thread so commands never wait on the disk.
+
+    Callers serialize their state before handing it over, which makes the bytes a
+    consistent snapshot however the game changes afterwards. replace() writes a
+    temporary file and renames it over the target, so a crash mid-write leaves the
+    previous file intact; a newer replace of a path drops any older write to it
+    that hasn't started. append() adds to a file in submission order. Paths are
+    made absolute when submitted, so a later working directory change doesn't
+    redirect a pending write. GameManagers share one writer, see shared_save_writer().
+    """
+
+    def __init__(self):
+        self.condition = threading.Condition()
+        self.pending = OrderedDict()
+        self.busy_path = None
+        self.thread = threading.Thread(target=self._run, name='SaveWriter', daemon=True)
+        self.thread.start()
+        atexit.register(self.flush)
+
+    def replace(self, path, data):
+        path = os.path.abspath(path)
+        with self.condition:
+            # The new contents overwrite the file anyway, so earlier pending writes are moot
+            self.pending.pop(path, None)
+            self.pending[path] = [('replace', data, None)]
+            self.condition.notify_all()
+
+    def append(self, path, data, lock=None):
+        """Append data to path, holding lock (if given) while writing."""
+        path = os.path.abspath(path)
+        with self.condition:
+            self.pending.setdefault(path, []).append(('append', data, lock))
+            self.condition.notify_all()
+
+    def wait(self, path):
+        """Block until every write submitted for path has reached the disk."""
+        path = os.path.abspath(path)
+        with self.condition:
+            while path in self.pending or self.busy_path == path:
+                self.condition.wait()
+
+    def flush(self):
+        """Block until every submitted write has reached the disk."""
+        with self.condition:
+            while self.pending or self.busy_path is not None:
+                self.condition.wait()
+
+    def _run(self):
+        while True:
+            with self.condition:
+                while not self.pending:
+                    self.condition.wait()
+                path, jobs = self.pending.popitem(last=False)
+                self.busy_path = path
+
+            try:
+                for kind, data, lock in jobs:
+                    if kind == 'replace':
+                        self._replace(path, data)
+                    else:
+                        with lock or nullcontext():
+                            with open(path, 'ab') as f:
+                                f.write(data)
+                trace.debug("Wrote %s update(s) to %s", len(jobs), path)
+            except Exception as e:
+                trace.error("Writing %s failed: %s", path, e)
+                print(f"An error occurred while saving {path}: {e}")
+            finally:
+                with self.condition:
+                    self.busy_path = None
+                    self.condition.notify_all()
+
+    def _replace(self, path, data):
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        temp_path = f"{path}.tmp"
+        with open(temp_path, 'wb') as f:
+            f.write(data)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(temp_path, path)
+
+
+# One writer per process, so sessions don't each leave a thread and an atexit hook behind,
+# and writes to a path stay in submission order whichever session made them
+_shared_writer = None
+_shared_writer_lock = threading.Lock()
+
+
+def shared_save_writer():
+    """Return the process's SaveWriter, starting it on first use."""
+    global _shared_writer
+    with _shared_writer_lock:
+        if _shared_writer is None:
+            _shared_writer = SaveWriter()
+        return _shared_writer
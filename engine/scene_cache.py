@@ -0,0 +1,57 @@
+# engine/scene_cache.py
+
+from collections import OrderedDict
+from utilities import convert_text_to_display
+
+
+class SceneEntry:
+    """A rendered scene description and, once asked for, its HTML."""
+    __slots__ = ('location_data', 'version', 'text', '_html')
+
+    def __init__(self, location_data, version, text):
+        self.location_data = location_data
+        self.version = version
+        self.text = text
+        self._html = None
+
+    @property
+    def html(self):
+        if self._html is None:
+            self._html = convert_text_to_display(self.text)
+        return self._html
+
+
+class SceneCache:
+    """
+    Least recently used cache of scene descriptions, one entry per location node.
+
+    An entry is only returned while the location's version matches the one it was
+    rendered at, so bumping the version is enough to invalidate it. last holds the
+    entry most recently returned or stored, which lets the caller reuse its HTML.
+    """
+
+    def __init__(self, max_size=256):
+        self.max_size = max_size
+        self.entries = OrderedDict()
+        self.last = None
+
+    def get(self, location_data, version):
+        entry = self.entries.get(id(location_data))
+        if entry is None or entry.location_data is not location_data or entry.version != version:
+            return None
+        self.entries.move_to_end(id(location_data))
+        self.last = entry
+        return entry
+
+    def put(self, location_data, version, text):
+        entry = SceneEntry(location_data, version, text)
+        self.entries[id(location_data)] = entry
+        self.entries.move_to_end(id(location_data))
+        if len(self.entries) > self.max_size:
+            self.entries.popitem(last=False)
+        self.last = entry
+        return entry
+
+    def clear(self):
+        self.entries.clear()
+        self.last = None
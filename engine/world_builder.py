@@ -1,35 +1,155 @@
 # engine/world_builder.py
 
 import json
-from icecream import ic
-import re
+from debug_config import DebugConfig
 from engine.ai_assist import AIAssist 
-from utilities import convert_text_to_display, load_working_world_data, normalize_name
+from engine.command_parser import CommandParser
+from engine.entity_index import EntityIndex
+from engine.event_bus import NPC_SPOKEN_TO, ITEM_GAINED, ITEM_GIVEN, LOCATION_ENTERED
+from engine.location_graph import LocationGraph
+from engine.location_index import LocationIndex
+from engine.world_overlay import location_fields
+from engine.scene_cache import SceneCache
+from engine.world_catalog import world_catalog
+from engine.world_store import LazyLocations
+from utilities import convert_text_to_display, normalize_name, normalize_world_names
 from interfaces import IWorldBuilder, IGameManager
 from PySide6.QtCore import QObject, Signal
 #from engine.npc import NPCManager
 
+trace = DebugConfig.tracer('world')
+
 class WorldBuilder(QObject, IWorldBuilder):
     display_text_signal = Signal(str)
     command_processed_signal = Signal() 
     last_spoken_npc = ""
 
+    # Most scene descriptions kept rendered at once
+    SCENE_CACHE_SIZE = 256
+
+    # Command grammar, compiled once and shared by every WorldBuilder
+    COMMAND_PARSER = CommandParser([
+        ("fast travel to", 'fast_travel_to_world', 'target'),
+        ("move to", 'move_player', 'target'),
+        ("go to", 'move_player', 'target'),
+        ("give", 'handle_give_take', 'transfer', 'to'),     # 'give 3 apples' or 'give sword to guard'
+        ("take", 'handle_give_take', 'transfer', 'from'),   # 'take 2 potions' or 'take key from chest'
+        ("examine", 'examine_item', 'target'),
+        ("talk to", 'handle_talk_to', 'phrase'),
+        ("speak to", 'handle_talk_to', 'phrase'),
+        ("open", 'handle_open', 'target'),
+        ("close", 'handle_close', 'target'),
+        ("look around", 'simple_command_handler', 'exact'),
+        ("look", 'simple_command_handler', 'exact'),
+        ("whereami", 'simple_command_handler', 'exact'),
+        ("where am i", 'simple_command_handler', 'exact'),
+        ("help", 'simple_command_handler', 'exact'),
+    ])
+
     def __init__(self, world_data, use_ai_assist=True):
         super().__init__()
         self.game_manager = None
-        self.world_data = world_data
         self.normalize_name = normalize_name
-        ic(f'WorldBuilder initialized with world data')
+        self.location_index = LocationIndex()
+        self.location_graph = LocationGraph(self.location_index)
+        self.entity_indexes = {}
+        self.open_containers = {}
+        self.location_versions = {}
+        self.changed_locations = {}
+        self.scene_cache = SceneCache(self.SCENE_CACHE_SIZE)
+        self.set_world_data(world_data)
+        trace.debug("WorldBuilder initialized with world data")
         self.use_ai_assist = use_ai_assist
         if self.use_ai_assist:
-            ic(f"AI assist enabled: {self.use_ai_assist}")
+            trace.debug("AI assist enabled: %s", self.use_ai_assist)
         else:
-            ic("AI assist disabled")
-        ic("WorldBuilder initialized, AI assist deferred")
+            trace.debug("AI assist disabled")
+        trace.debug("WorldBuilder initialized, AI assist deferred")
 
     def set_world_data(self, world_data):
         self.world_data = world_data
-        ic("World data set in WorldBuilder")
+        # Normalize every name and index every location once so lookups don't walk the world tree
+        locations = (world_data or {}).get('locations')
+        if isinstance(locations, LazyLocations):
+            # Locations load as they are first used; each one's names are normalized then
+            locations.on_load = self.location_loaded
+            normalize_world_names({'locations': locations.loaded()})
+        else:
+            normalize_world_names(world_data or {})
+        self.location_index.build(world_data or {})
+        self.entity_indexes = {}
+        self.location_versions = {}
+        self.changed_locations = {}
+        self.scene_cache.clear()
+        self.track_open_containers()
+        trace.debug("World data set in WorldBuilder")
+
+    def reset_session(self):
+        """Forget what the player did before a save was loaded over the session, e.g. who they last talked to."""
+        self.last_spoken_npc = ""
+
+    def get_entity_index(self, location_data):
+        """Return the EntityIndex for a location node, building it on first use."""
+        cached = self.entity_indexes.get(id(location_data))
+        # Keep the node alongside its index so a recycled id() can't return another node's entities
+        if cached is None or cached[0] is not location_data:
+            cached = (location_data, EntityIndex(location_data))
+            self.entity_indexes[id(location_data)] = cached
+        return cached[1]
+
+    def touch_location(self, location_data):
+        """Record that a location's NPCs, items, containers or paths changed."""
+        self.entity_indexes.pop(id(location_data), None)
+        self.location_versions[id(location_data)] = self.location_version(location_data) + 1
+        if location_data is not None:
+            self.changed_locations[id(location_data)] = location_data
+        self.location_index.note_change()
+
+    def location_version(self, location_data):
+        return self.location_versions.get(id(location_data), 0)
+
+    def take_location_changes(self):
+        """Return {location path: fields} for the locations changed since the last call, and forget them."""
+        changes = {}
+        for location_data in self.changed_locations.values():
+            path = self.location_index.path_of(location_data)
+            if path is not None:
+                changes[path] = location_fields(location_data)
+        self.changed_locations = {}
+        return changes
+
+    def set_container_open(self, container, is_open):
+        location_data = self.get_current_location_data()
+        container['isOpen'] = is_open
+        if is_open:
+            self.open_containers[id(container)] = (container, location_data)
+        else:
+            self.open_containers.pop(id(container), None)
+        self.touch_location(location_data)
+
+    def track_open_containers(self):
+        """Collect the containers the world data already has open, keyed by id() with their location."""
+        self.open_containers = {}
+        if self.location_index.stale:
+            self.location_index.build(self.world_data or {})
+        for entry in self.location_index.entries.values():
+            if entry.loaded:
+                self._track_open_containers_in(entry.node)
+
+    def _track_open_containers_in(self, location_data):
+        for container in location_data.get('containers', []):
+            if container.get('isOpen', False):
+                self.open_containers[id(container)] = (container, location_data)
+
+    def location_loaded(self, location):
+        """Prepare a location of a lazily loaded world when it is first read."""
+        normalize_world_names({'locations': [location]})
+        nodes = [location]
+        for sublocation in location.get('sublocations', []):
+            nodes.append(sublocation)
+            nodes.extend(sublocation.get('rooms', []))
+        for node in nodes:
+            self._track_open_containers_in(node)
 
     def set_game_manager(self, game_manager: IGameManager):
         if not game_manager:
@@ -41,11 +161,11 @@ class WorldBuilder(QObject, IWorldBuilder):
     def initialize_ai_assist(self):
         if not self.game_manager or not self.game_manager.player_sheet:
             raise ValueError("GameManager with PlayerSheet is required for AIAssist")
-        ic("Initializing AI assist")
+        trace.debug("Initializing AI assist")
         self.ai_assist = AIAssist(self.game_manager.player_sheet, self)
 
     def incoming_command(self, command):
-        ic(f"Received command: {command}")
+        trace.debug("Received command: %s", command)
 
         # Bypass if command is help
         if command == "help":
@@ -70,71 +190,47 @@ class WorldBuilder(QObject, IWorldBuilder):
         try:
             # Check if AI assist is enabled and process the command
             if self.use_ai_assist:
-                ic("Sending command to AI for processing.")
+                trace.debug("Sending command to AI for processing.")
                 response = self.ai_assist.handle_player_command(command)
-                ic(f"AI responsed: {response}")
+                trace.debug("AI responsed: %s", response)
             else:
-                ic("Processing command directly.")
-
-                # Regular expressions for different command patterns
-                patterns = {
-                    r"^(fast travel to) (.+)$": self.fast_travel_to_world,
-                    r"^(move to|go to) (.+)$": self.move_player,
-                    r"^(give) (\d+) (.+)$": self.interact_with,  # for 'give 3 apples'
-                    r"^(give) (.+)$": self.interact_with,        # for 'give sword'
-                    r"^(take) (\d+) (.+)$": self.interact_with,  # for 'take 2 potions'
-                    r"^(take) (.+)$": self.interact_with,        # for 'take key'
-                    r"^(examine) (.+)$": self.examine_item,
-                    r"^(talk to|speak to) (.+)$": self.interact_with,
-                    r"^(open|close) (.+)$": self.interact_with,
-                    r"^(look around|look|whereami|where am i|help)$": self.simple_command_handler
-                }
-
-                # Iterate through patterns to find a match
-                for pattern, handler in patterns.items():
-                    ic(f"Checking pattern: {pattern}")
-                    ic(f"Checking handler: {handler}")
-                    match = re.match(pattern, command, re.IGNORECASE)
-                    ic(f"Match: {match}")
-                    if match:
-                        groups = match.groups()
-                        if handler in [self.move_player, self.fast_travel_to_world]:
-                            # For move_player and interact_with, pass only the required arguments
-                            response = handler(groups[1])  # groups[1] will contain the target
-                        else:
-                            # For other commands, pass all captured groups
-                            response = handler(*groups)
-                        break
+                trace.debug("Processing command directly.")
+
+                parsed = self.COMMAND_PARSER.parse(command)
+                if parsed:
+                    handler_name, args = parsed
+                    response = getattr(self, handler_name)(*args)
                 else:
                     response = convert_text_to_display(f'Unknown command: {command}')
 
+            # Log what the command changed, so a crash before the next save can be recovered
+            self.game_manager.log_command(command)
 
             # Emit the signal to indicate command processing is complete
             self.command_processed_signal.emit()
-            return convert_text_to_display(response)
+            return self.response_to_display(response)
 
         except Exception as e:
             # Handle any exceptions that occur during command processing
-            ic(f"Error processing command: {e}")
+            trace.error("Error processing command: %s", e)
             response = convert_text_to_display(f"Error processing command: {e}")
             # Emit the signal even when an error occurs
             self.command_processed_signal.emit()
             return response
 
     def is_container_open(self):
-        current_location = self.game_manager.player_sheet.location
-        if isinstance(current_location, dict):
-            current_location = current_location.get("location/sublocation", "Unknown Location")
-        location_data = self.find_location_data(current_location)
-
-        if location_data and 'containers' in location_data:
-            for container in location_data['containers']:
-                if container.get('isOpen', False):
-                    ic(f"Container open: {container['name']}")
-                    ic(f"Container open: {container['name']}")
-                    return container['name']  
-                
-        ic("No container open.")
+        # Nothing is open in most turns, so skip the location lookup entirely
+        if not self.open_containers:
+            trace.debug("No container open.")
+            return None
+
+        location_data = self.get_current_location_data()
+        for container, container_location in self.open_containers.values():
+            if container_location is location_data:
+                trace.debug("Container open: %s", container['name'])
+                return container['name']
+
+        trace.debug("No container open.")
         return None # No container open
 
     def simple_command_handler(self, command):
@@ -148,49 +244,21 @@ class WorldBuilder(QObject, IWorldBuilder):
         else:
             return f"Unknown simple command: {command}"
 
-    def interact_with(self, *args):
-        full_command = ' '.join(args)
-        ic(f"Handling command: {full_command}")
-
-        # Define regex patterns for interaction commands
-        command_patterns = {
-            r"^(talk to) (.+)$": self.handle_talk_to,
-            r"^(give|take) (.+)$": self.handle_give_take,
-            r"^(open) (.+)$": self.handle_open,
-            r"^(close) (.+)$": self.handle_close
-        }
-        
-        # Iterate through patterns to find a match
-        for pattern, handler in command_patterns.items():
-            ic(f"Checking pattern: {pattern}")
-            match = re.match(pattern, full_command, re.IGNORECASE)
-            if match:
-                ic(f"Match found: {match}")
-                # Pass only the necessary groups to the handler
-                if handler in [self.handle_open, self.handle_close]:
-                    return handler(match.group(2))  # Only pass the target name
-                else:
-                    return handler(*match.groups())
-
-        return convert_text_to_display(f"Unknown interaction command: {full_command}")
-
     def handle_close(self, target_name=None):
         # Get the current location data
         current_location_data = self.get_current_location_data()
 
+        entities = self.get_entity_index(current_location_data)
+
         if target_name:
-            # Normalize the target name
-            normalized_target_name = self.normalize_name(target_name)
             # Find the specific container by normalized name
-            container = next((obj for obj in current_location_data.get('containers', [])
-                            if self.normalize_name(obj['name']) == normalized_target_name), None)
+            container = entities.containers.get(self.normalize_name(target_name))
 
             if not container:
                 return convert_text_to_display(f"There is no '{target_name}' to close here.")
         else:
             # Find the first open container if no specific name is provided
-            container = next((obj for obj in current_location_data.get('containers', [])
-                            if obj.get('isOpen', False)), None)
+            container = entities.open_containers[0] if entities.open_containers else None
 
             if not container:
                 return convert_text_to_display("There are no open containers to close.")
@@ -200,7 +268,7 @@ class WorldBuilder(QObject, IWorldBuilder):
             return convert_text_to_display(f"The '{container['name']}' is already closed.")
 
         # Close the container
-        container['isOpen'] = False
+        self.set_container_open(container, False)
 
         return convert_text_to_display(f"You have closed the '{container['name']}'.")
 
@@ -208,11 +276,8 @@ class WorldBuilder(QObject, IWorldBuilder):
         # Get the current location data
         current_location_data = self.get_current_location_data()
 
-        # Normalize the target name
-        normalized_target_name = self.normalize_name(target_name)
         # Find the container in the current location by normalized name
-        container = next((obj for obj in current_location_data.get('containers', [])
-                        if self.normalize_name(obj['name']) == normalized_target_name), None)
+        container = self.get_entity_index(current_location_data).containers.get(self.normalize_name(target_name))
 
         if not container:
             return convert_text_to_display(f"There is no '{target_name}' to open here.")
@@ -223,7 +288,7 @@ class WorldBuilder(QObject, IWorldBuilder):
             return convert_text_to_display(f"The '{target_name}' is already open.\n{contents}")
         else:
             # Open the container
-            container['isOpen'] = True
+            self.set_container_open(container, True)
             contents = self.list_container_contents(container)
             return convert_text_to_display(f"You have opened the '{target_name}'.\n{contents}")
 
@@ -242,14 +307,14 @@ class WorldBuilder(QObject, IWorldBuilder):
             if target.get('isOpen', False):
                 return f"{target['name']} is already open."
             else:
-                target['isOpen'] = True
+                self.set_container_open(target, True)
                 return f"{target['name']} is now open."
 
         elif interaction_type == 'close':
             if not target.get('isOpen', False):
                 return f"{target['name']} is already closed."
             else:
-                target['isOpen'] = False
+                self.set_container_open(target, False)
                 return f"{target['name']} is now closed."
 
         elif interaction_type == 'give':
@@ -262,31 +327,31 @@ class WorldBuilder(QObject, IWorldBuilder):
 
     def handle_talk_to(self, command, npc_name):
         self.last_spoken_npc = npc_name
-        ic(f"Last spoken NPC: {self.last_spoken_npc}")
-        ic(f"Handling 'talk to' command with NPC: {npc_name}")
+        trace.debug("Last spoken NPC: %s", self.last_spoken_npc)
+        trace.debug("Handling 'talk to' command with NPC: %s", npc_name)
 
         # Get the current location data
         location_data = self.get_current_location_data()
 
         # Find the NPC in the current location
         target_npc = self.find_interaction_target(npc_name, location_data)
-        ic(f"Target NPC: {target_npc}")
+        trace.debug("Target NPC: %s", target_npc)
 
         if target_npc:
             # Execute the 'talk to' interaction if the NPC is found
             interaction = {'type': 'talk to'}
             response = self.execute_interaction(interaction, target_npc)
-            ic(f"Response: {response}")
+            trace.debug("Response: %s", response)
 
             # New code to handle triggers
             if 'triggers' in target_npc:
                 self.handle_npc_triggers(target_npc['triggers'])
 
-            # Check and update quests after talking to the NPC
-            ic(f'npc_name: {npc_name}')
-            ic(f'last spoken npc: {self.last_spoken_npc}')
-            self.game_manager.quest_tracker.check_all_quests()
-            ic(f"Quests after talking to NPC: {self.game_manager.player_sheet.quests}")
+            # Let quest objectives waiting on this NPC check themselves
+            trace.debug("npc_name: %s", npc_name)
+            trace.debug("last spoken npc: %s", self.last_spoken_npc)
+            self.game_manager.events.publish(NPC_SPOKEN_TO, target_npc['name'])
+            trace.debug("Quests after talking to NPC: %s", self.game_manager.player_sheet.quests)
 
             return response
         else:
@@ -309,20 +374,17 @@ class WorldBuilder(QObject, IWorldBuilder):
                 'location': trigger['location']
             }
             self.game_manager.player_sheet.add_fast_travel_location(fast_travel_location)
-            ic(f"Fast travel location added: {trigger['name']}")
+            trace.debug("Fast travel location added: %s", trigger['name'])
 
-    def handle_give_take(self, action, details):
-        ic(f"Handling '{action}' command with details: {details}")
-
-        # Split the details into parts
-        target_name, quantity, item_name = self.parse_give_take_details(details.split())
+    def handle_give_take(self, action, quantity, item_name, target_name=None):
+        trace.debug("Handling '%s' command: %s of %s, target %s", action, quantity, item_name, target_name)
 
         # Get the current location data
         location_data = self.get_current_location_data()
 
         if not target_name:
             # Find an open container if no target is specified
-            open_containers = [c for c in location_data.get('containers', []) if c.get('isOpen', False)]
+            open_containers = self.get_entity_index(location_data).open_containers
             target = open_containers[0] if open_containers else None
         else:
             # Find the specified target
@@ -340,57 +402,12 @@ class WorldBuilder(QObject, IWorldBuilder):
 
         return convert_text_to_display(response)
 
-    def parse_give_take_details(self, parts):
-        ic(f"Parsing give/take details: {parts}")
-        quantity = 1  # Default quantity
-        item_name = None
-        target = None
-
-        # Check if the word 'to' is present, indicating giving to an NPC
-        if 'to' in parts:
-            to_index = parts.index('to|from')
-            # Parse quantity if specified
-            if parts[0].isdigit():
-                quantity = int(parts.pop(0))
-                item_name = ' '.join(parts[:to_index - 1])  # Adjust index due to popping quantity
-            else:
-                item_name = ' '.join(parts[:to_index])
-            target = ' '.join(parts[to_index + 1:])  # NPC name comes after 'to'
-        else:
-            # No 'to' present, giving to a container
-            if parts[0].isdigit():
-                quantity = int(parts.pop(0))
-            item_name = ' '.join(parts)
-
-        ic(f"Quantity: {quantity}, Item name: {item_name}, Target: {target}")
-        return target, quantity, item_name
-
-
     def find_interaction_target(self, target_name, location_data):
-        normalized_target_name = self.normalize_name(target_name)
-
-        # Check NPCs
-        for npc in location_data.get('npcs', []):
-            ic(f"Checking NPC: {npc['name']}")
-            if self.normalize_name(npc['name']) == normalized_target_name:
-                return npc
-
-        # Check items
-        for item in location_data.get('items', []):
-            ic(f"Checking item: {item['name']}")
-            if self.normalize_name(item['name']) == normalized_target_name:
-                return item
-
-        # Check containers
-        for container in location_data.get('containers', []):
-            ic(f"Checking container: {container['name']}")
-            if self.normalize_name(container['name']) == normalized_target_name:
-                return container
-
-        return None
+        # NPCs take precedence over items, and items over containers
+        return self.get_entity_index(location_data).targets.get(self.normalize_name(target_name))
 
     def process_take_command(self, target, item_name, quantity):
-        ic(f"Processing take command: taking {quantity} of {item_name} from {target['name']}")
+        trace.debug("Processing take command: taking %s of %s from %s", quantity, item_name, target['name'])
 
         # Check if the target has the item
         if not self.target_has_item(target, item_name, quantity):
@@ -405,38 +422,38 @@ class WorldBuilder(QObject, IWorldBuilder):
 
 
     def target_has_item(self, target, item_name, quantity):
-        ic(f"Checking if {target} has {quantity} of {item_name}")
+        trace.debug("Checking if %s has %s of %s", target, quantity, item_name)
         normalized_item_name = self.normalize_name(item_name)
 
         # Determine if target is a player or NPC/container, and get the corresponding inventory
-        ic(f"Target: {target}")
+        trace.debug("Target: %s", target)
         if self.is_player_entity(target):
-            ic("Target is player entity")
+            trace.debug("Target is player entity")
             target_inventory = target.inventory  # If it's a player entity
         else:
-            ic("Target is not player entity")
+            trace.debug("Target is not player entity")
             target_inventory = target.get('inventory', [])  # If it's an NPC/container
 
-        ic(f"Target inventory: {target_inventory}")
+        trace.debug("Target inventory: %s", target_inventory)
 
         # Check if the target has the item in the required quantity
         for item in target_inventory:
-            ic(f"Checking item: {item['name']}")
+            trace.debug("Checking item: %s", item['name'])
             if self.normalize_name(item['name']) == normalized_item_name and item['quantity'] >= quantity:
-                ic(f"Found item: {item['name']}")
+                trace.debug("Found item: %s", item['name'])
                 return True
 
-        ic(f"Item not found: {item_name}")
+        trace.debug("Item not found: %s", item_name)
         return False
 
 
     def is_player_entity(self, entity):
-        ic(f"Checking if {entity} is player entity")
+        trace.debug("Checking if %s is player entity", entity)
         return entity == self.game_manager.player_sheet
 
     def transfer_item(self, source, target, item_name, quantity):
         normalized_item_name = self.normalize_name(item_name)
-        ic(f"Transferring {quantity} of {normalized_item_name} from {source} to {target}")
+        trace.debug("Transferring %s of %s from %s to %s", quantity, normalized_item_name, source, target)
 
         # Determine if source and target are players or NPCs/containers
         source_inventory = source.inventory if self.is_player_entity(source) else source.get('inventory', [])
@@ -458,6 +475,13 @@ class WorldBuilder(QObject, IWorldBuilder):
 
                 # Add item to target
                 self.add_item_to_inventory(target_inventory, item_to_transfer)
+                self.touch_location(self.get_current_location_data())
+                if self.is_player_entity(target):
+                    self.game_manager.events.publish(ITEM_GAINED, item_to_transfer['name'], quantity=quantity,
+                                                     source=source.get('name'))
+                elif self.is_player_entity(source):
+                    self.game_manager.events.publish(ITEM_GIVEN, item_to_transfer['name'], quantity=quantity,
+                                                     recipient=target.get('name'))
                 return f"Transferred {quantity} of {item_name}"
 
         if not item_removed:
@@ -473,24 +497,24 @@ class WorldBuilder(QObject, IWorldBuilder):
         inventory.append(item_to_add)
 
     def process_give_command(self, target, item_name, quantity):
-        ic(f"Processing give command: giving {quantity} of {item_name} to {target}")
+        trace.debug("Processing give command: giving %s of %s to %s", quantity, item_name, target)
 
         # Check if the player has the item
-        ic(f"Checking if player has {quantity} of {item_name}")
+        trace.debug("Checking if player has %s of %s", quantity, item_name)
         if not self.target_has_item(self.game_manager.player_sheet, item_name, quantity):
-            ic(f"Player does not have {quantity} of {item_name}")
+            trace.debug("Player does not have %s of %s", quantity, item_name)
             return convert_text_to_display(f"You do not have {quantity} of {item_name} to give.")
         
         # Handle case when target is a container
         if isinstance(target, dict) and target.get('type') == 'Container':
-            ic(f"{target} is a container")
+            trace.debug("%s is a container", target)
             if target.get('isOpen', False):
                 # Transfer the item from the player to the container
                 response = self.transfer_item(self.game_manager.player_sheet, target, item_name, quantity)
             else:
                 response = f"The {target['name']} is closed. You cannot put items in it."
         elif isinstance(target, dict) and target.get('type') == 'NPC':
-            ic(f"{target} is an NPC")
+            trace.debug("%s is an NPC", target)
             # Verify 'give' as a valid interaction for the NPC
             can_give_item = any(interaction['type'] == 'give' for interaction in target.get('interactions', []))
 
@@ -509,7 +533,7 @@ class WorldBuilder(QObject, IWorldBuilder):
         contents_text = f"{container['name']} contains:\n"
         for item in container.get('inventory', []):
             contents_text += f"- {item['name']} ({item['quantity']}) - {item['description']}\n"
-        ic(f"Contents text: {contents_text}")
+        trace.debug("Contents text: %s", contents_text)
         return contents_text.strip()
 
     def get_current_location_data(self):
@@ -517,35 +541,27 @@ class WorldBuilder(QObject, IWorldBuilder):
         current_location_str = current_location if isinstance(current_location, str) else current_location.get("location/sublocation", "Unknown Location")
         location_data = self.find_location_data(current_location_str)
         if location_data:
-            ic(f"Current location data retrieved for: {current_location_str}")
+            trace.debug("Current location data retrieved for: %s", current_location_str)
         else:
-            ic(f"No data found for current location: {current_location_str}")
+            trace.debug("No data found for current location: %s", current_location_str)
         return location_data
 
     def find_location_data(self, location_name):
         if isinstance(location_name, dict):
             location_name = location_name.get("location/sublocation", "Unknown Location")
 
-        normalized_location_name = self.normalize_name(location_name)
-        ic("finding location debug")
-        ic(self.world_data)
-        for location in self.world_data.get('locations', []):
-            ic(f"Searching for location: {normalized_location_name}")
-            if isinstance(location, dict) and 'name' in location:
-                if self.normalize_name(location['name']) == normalized_location_name:
-                    ic(f"Found location: {location_name}")
-                    return location
-                for sublocation in location.get('sublocations', []):
-                    if self.normalize_name(sublocation['name']) == normalized_location_name:
-                        ic(f"Found sublocation: {location_name}")
-                        return sublocation
-                    for room in sublocation.get('rooms', []):
-                        if self.normalize_name(room['name']) == normalized_location_name:
-                            ic(f"Found room: {location_name}")
-                            room['parent_sublocation'] = sublocation['name']  # This is optional, for context
-                            return room
-        ic(f"Location or room not found: {location_name}")
-        return None
+        entry = self.location_index.lookup(location_name)
+        if entry is None:
+            trace.debug("Location or room not found: %s", location_name)
+            return None
+
+        location = entry.node
+        if len(entry.parents) == 2:
+            trace.debug("Found room: %s", location_name)
+            location['parent_sublocation'] = entry.parents[-1]['name']  # This is optional, for context
+        else:
+            trace.debug("Found location: %s", location_name)
+        return location
 
     def fast_travel_to_world(self, world_name):
         available_worlds = [world.replace(" ", "").lower() for world in self.game_manager.player_sheet.get_fast_travel_worlds()]
@@ -556,15 +572,18 @@ class WorldBuilder(QObject, IWorldBuilder):
             self.display_text_signal.emit(text)  # Emit signal instead of direct call
             return False  # Return a boolean based on the outcome
         
+        # World data files keep their own casing, e.g. OdysseyVR.json
+        formatted_world_name = self.resolve_world_key(formatted_world_name)
+
         try:
             self.game_manager.save_game()  # Save the game before fast traveling
 
-            self.world_data = load_working_world_data(formatted_world_name)  # Load the world data for the new world
+            self.set_world_data(self.game_manager.load_world_data(formatted_world_name))  # Load the world data for the new world
 
             main_entry_location = next((loc for loc in self.world_data['locations'] if loc.get('main-entry', False)), None)
             if main_entry_location:
                 new_location = {"world": formatted_world_name, "location/sublocation": main_entry_location['name']}
-                self.game_manager.player_sheet.location = new_location
+                self.enter_location(new_location)
                 self.update_game_state_for_fast_travel(formatted_world_name)  
                 self.game_manager.update_location(new_location)  # Update the game manager with the new location
 
@@ -584,6 +603,10 @@ class WorldBuilder(QObject, IWorldBuilder):
             return html_text
 
 
+    def resolve_world_key(self, world_name):
+        """Return the key of the world data file matching a world name, ignoring case and spaces."""
+        return world_catalog().resolve(world_name) or world_name.replace(" ", "").lower()
+
     def update_game_state_for_fast_travel(self, new_world_name):
         # Update any world-specific game state here
         CapitalizedWorldName = new_world_name.capitalize()
@@ -622,7 +645,7 @@ class WorldBuilder(QObject, IWorldBuilder):
                 description = entity.get('description', 'No description available')
                 entities_text += f"- {name} - {description}\n"
 
-        ic(f"{entity_type.capitalize()} text: {entities_text}")
+        trace.debug("%s text: %s", entity_type.capitalize(), entities_text)
         return entities_text.strip()
 
 
@@ -653,7 +676,7 @@ class WorldBuilder(QObject, IWorldBuilder):
         if 'keywords' in room_data:
             keywords_text = ", ".join(room_data['keywords'])
             description += f" \n Keywords: {keywords_text}\n"
-        ic(f"Room description: {description}")
+        trace.debug("Room description: %s", description)
         return description
 
 
@@ -662,40 +685,40 @@ class WorldBuilder(QObject, IWorldBuilder):
         if 'keywords' in location_data:
             keywords_text = ", ".join(location_data['keywords'])
             description += f" \n\n Keywords: {keywords_text}\n"
-        ic(f"Location description: {description}")
+        trace.debug("Location description: %s", description)
         return description
 
 
     def is_item_in_open_container(self, item_name, location_data):
-        normalized_item_name = self.normalize_name(item_name)
-        for container in location_data.get('containers', []):
-            if container.get('isOpen', False):
-                for item in container.get('contains', []):
-                    if self.normalize_name(item['name']) == normalized_item_name:
-                        return True
-        return False
+        return self.normalize_name(item_name) in self.get_entity_index(location_data).open_items
         
+    def enter_location(self, location):
+        """Move the player to a {'world', 'location/sublocation'} location and publish that it was entered."""
+        self.game_manager.player_sheet.location = location
+        path = location['location/sublocation']
+        self.game_manager.events.publish(LOCATION_ENTERED, path.split('/')[-1], world=location['world'], path=path)
+
     def move_player(self, location_name):
         # Get the current location data from the player's current location
         current_location = self.game_manager.player_sheet.location
         current_location_str = current_location.get("location/sublocation", "Unknown Location")
         
-        ic(f"Attempting to move. Current location: {current_location_str}, Destination: {location_name}") 
+        trace.debug("Attempting to move. Current location: %s, Destination: %s", current_location_str, location_name) 
 
         current_location_data = self.find_location_data(current_location_str)
         if not current_location_data:
             return "You are in an unknown location and cannot move."
 
         sanitized_location_name = self.normalize_name(location_name)
-        ic(f"Sanitized destination name: {sanitized_location_name}") 
+        trace.debug("Sanitized destination name: %s", sanitized_location_name) 
 
         if 'paths' in current_location_data:
             for direction, destination in current_location_data['paths'].items():
                 normalized_destination = self.normalize_name(destination)
-                ic(f"Checking path: {direction} to {normalized_destination}") 
+                trace.debug("Checking path: %s to %s", direction, normalized_destination) 
                 if normalized_destination == sanitized_location_name:
-                    self.game_manager.player_sheet.location = {"world": current_location['world'], "location/sublocation": destination}
-                    ic(f"Player moved to {destination}.")
+                    self.enter_location({"world": current_location['world'], "location/sublocation": destination})
+                    trace.debug("Player moved to %s.", destination)
                     text = convert_text_to_display(f"Moving to {destination}.")
                     self.display_text_signal.emit(text)
                     return f"{self.where_am_i()}."
@@ -703,32 +726,46 @@ class WorldBuilder(QObject, IWorldBuilder):
         if 'sublocations' in current_location_data:
             for sublocation in current_location_data['sublocations']:
                 normalized_sublocation_name = self.normalize_name(sublocation['name'])
-                ic(f"Checking sublocation: {normalized_sublocation_name}") 
+                trace.debug("Checking sublocation: %s", normalized_sublocation_name) 
                 if normalized_sublocation_name == sanitized_location_name:
                     new_location_dict = {"world": current_location['world'], "location/sublocation": sublocation['name']}
-                    self.game_manager.player_sheet.location = new_location_dict
-                    ic(f"Player moved to {sublocation['name']}.")
+                    self.enter_location(new_location_dict)
+                    trace.debug("Player moved to %s.", sublocation['name'])
                     text = convert_text_to_display(f"Moving to {sublocation['name']}.")
                     self.display_text_signal.emit(text)
                     return f"{self.where_am_i()}."
                 if 'rooms' in sublocation:
                     for room in sublocation['rooms']:
                         normalized_room_name = self.normalize_name(room['name'])
-                        ic(f"Checking room: {normalized_room_name} in sublocation: {normalized_sublocation_name}")  
+                        trace.debug("Checking room: %s in sublocation: %s", normalized_room_name, normalized_sublocation_name)  
                         if normalized_room_name == sanitized_location_name:
                             new_location_dict = {
                                 "world": current_location['world'],
                                 "location/sublocation": f"{sublocation['name']}/{room['name']}"
                             }
-                            self.game_manager.player_sheet.location = new_location_dict
-                            ic(f"Player moved to {room['name']} within {sublocation['name']}.")
+                            self.enter_location(new_location_dict)
+                            trace.debug("Player moved to %s within %s.", room['name'], sublocation['name'])
                             text = convert_text_to_display(f"Moving to {room['name']} within {sublocation['name']}.")
                             self.display_text_signal.emit(text)
                             return f"{self.where_am_i()}."
-                        else:
-                            return "You cannot access this area yet."
 
-        ic(f"Could not find path to: {sanitized_location_name} from {current_location_str}")
+        # Not a neighbour, so travel the shortest route there in one go
+        route = self.location_graph.route(current_location_str, location_name)
+        if route and len(route) == 1:
+            return f"You are already in {route[0].node['name']}."
+        if route:
+            destination = route[-1]
+            self.enter_location({"world": current_location['world'], "location/sublocation": destination.path})
+            trace.debug("Player travelled to %s via %s.", destination.path, [entry.path for entry in route[1:-1]])
+            stops = ', '.join(entry.node['name'] for entry in route[1:-1])
+            if stops:
+                text = convert_text_to_display(f"Travelling through {stops} to {destination.node['name']}.")
+            else:
+                text = convert_text_to_display(f"Moving to {destination.node['name']}.")
+            self.display_text_signal.emit(text)
+            return f"{self.where_am_i()}."
+
+        trace.debug("Could not find path to: %s from %s", sanitized_location_name, current_location_str)
         return f"Cannot determine how to move to '{location_name}'."
 
     def examine_item(self, item_name):
@@ -749,9 +786,21 @@ class WorldBuilder(QObject, IWorldBuilder):
     def look_around(self):
         current_location_data = self.get_current_location_data()
         if current_location_data:
-            return self.create_scene_description(current_location_data)
+            version = self.location_version(current_location_data)
+            scene = self.scene_cache.get(current_location_data, version)
+            if scene is None:
+                scene = self.scene_cache.put(current_location_data, version,
+                                             self.create_scene_description(current_location_data))
+            return scene.text
         return "It's too dark to see anything."
 
+    def response_to_display(self, response):
+        # Reuse the cached HTML when the response is the scene look_around just returned
+        scene = self.scene_cache.last
+        if scene is not None and response is scene.text:
+            return scene.html
+        return convert_text_to_display(response)
+
     def display_help(self):
         help_text = (
             "Available commands:\n\n"
@@ -780,22 +829,31 @@ class WorldBuilder(QObject, IWorldBuilder):
         """
         if new_world_name:
             # Load and update the world data for a new world
-            new_world_data = load_working_world_data(new_world_name)
+            new_world_data = self.game_manager.load_world_data(new_world_name)
             if new_world_data:
-                self.world_data = new_world_data
-                ic(f"World data updated to {new_world_name}")
+                self.set_world_data(new_world_data)
+                trace.debug("World data updated to %s", new_world_name)
                 return True
             else:
-                ic(f"Failed to load world data for {new_world_name}")
+                trace.warning("Failed to load world data for %s", new_world_name)
                 return False
         else:
             # Update specific location in the current world data
             for location in self.world_data.get('locations', []):
                 if location['name'].lower() == location_name.lower():
                     self._apply_updates(location, update_dict)
+                    self.touch_location(location)
                 for sublocation in location.get('sublocations', []):
                     if sublocation['name'].lower() == location_name.lower():
                         self._apply_updates(sublocation, update_dict)
+                        self.touch_location(sublocation)
+            # Names, children or paths may have changed, so re-index and re-route on the next lookup
+            self.location_index.invalidate()
+            self.location_graph.invalidate()
+            self.entity_indexes = {}
+            self.location_versions = {}
+            self.scene_cache.clear()
+            self.track_open_containers()
             return True
 
 
@@ -815,31 +873,22 @@ class WorldBuilder(QObject, IWorldBuilder):
 
     def close_all_containers(self):
         """Close all open containers in the world."""
-        for location in self.world_data.get('locations', []):
-            self._close_containers_in_location(location)
-            for sublocation in location.get('sublocations', []):
-                self._close_containers_in_location(sublocation)
-
-    def _close_containers_in_location(self, location):
-        """Close all containers in a specific location."""
-        for container in location.get('containers', []):
+        for container, location_data in self.open_containers.values():
             container['isOpen'] = False
+            self.touch_location(location_data)
+        self.open_containers = {}
 
 
  
     def get_item_data(self, item_name, location_data):
-        # Check in location items
-        for item in location_data.get('items', []):
-            if self.normalize_name(item['name']) == self.normalize_name(item_name):
-                return item
+        entities = self.get_entity_index(location_data)
+        normalized_item_name = self.normalize_name(item_name)
 
-        # Check in open containers
-        for container in location_data.get('containers', []):
-            if container.get('isOpen', False):
-                for item in container.get('contains', []):
-                    if self.normalize_name(item['name']) == self.normalize_name(item_name):
-                        return item
-        return None
+        # Check in location items, then in open containers
+        item = entities.items.get(normalized_item_name)
+        if item is None:
+            item = entities.open_items.get(normalized_item_name)
+        return item
     
     def create_scene_description(self, location_data):
         # Introductory description of the scene
@@ -0,0 +1,136 @@
+# engine/world_catalog.py
+
+import json
+import os
+import threading
+from debug_config import DebugConfig
+from engine.data_cache import DataCache
+from engine.world_store import INDEX_DIRECTORY, WORLD_DIRECTORY, open_world_store
+
+trace = DebugConfig.tracer('world')
+
+CATALOG_PATH = os.path.join(INDEX_DIRECTORY, 'catalog.json')
+
+
+class WorldCatalog:
+    """
+    Display name, size, main entry and location count of every world in data/worlds.
+
+    Entries are kept in a manifest beside the compiled worlds and checked against
+    each .json file's size and mtime. A stale or new entry is rebuilt from its
+    WorldStore's index, which holds everything the catalog needs, so the world's
+    locations are never decoded. Once loaded, the catalog is only rescanned when
+    the directory's own mtime changes (a world added, removed or replaced), so
+    listing worlds costs a single stat however many or large they are.
+
+    A world edited in place leaves the directory's mtime alone, so with
+    DataCache.hot_reload on every listing rescans, re-checking each file's size
+    and mtime; only the entries of changed files are rebuilt.
+    """
+
+    def __init__(self, directory=WORLD_DIRECTORY, manifest_path=CATALOG_PATH):
+        self.directory = directory
+        self.manifest_path = manifest_path
+        self.entries = {}
+        self.scanned = None
+        self.lock = threading.Lock()
+
+    def worlds(self):
+        """Return {world key: entry}, rescanning first if the directory has changed."""
+        try:
+            directory_mtime = os.stat(self.directory).st_mtime_ns
+        except FileNotFoundError:
+            return {}
+        if directory_mtime != self.scanned or DataCache.hot_reload:
+            with self.lock:
+                if directory_mtime != self.scanned or DataCache.hot_reload:
+                    self._scan()
+                    self.scanned = directory_mtime
+        return self.entries
+
+    def names(self):
+        """Return {world key: display name}."""
+        return {key: entry['name'] for key, entry in self.worlds().items()}
+
+    def resolve(self, world_name):
+        """Return the key of the world matching a name, ignoring case and spaces, or None."""
+        formatted_world_name = world_name.replace(" ", "").lower()
+        for world_key in self.worlds():
+            if world_key.replace(" ", "").lower() == formatted_world_name:
+                return world_key
+        return None
+
+    def _scan(self):
+        if self.scanned is None:
+            self.entries = self._read_manifest()
+
+        entries = {}
+        changed = False
+        for item in os.scandir(self.directory):
+            if not item.name.endswith('.json') or item.name.startswith('working_') or not item.is_file():
+                continue
+            world_key = item.name[:-5]
+            stat = item.stat()
+            entry = self.entries.get(world_key)
+            if entry is None or entry['size'] != stat.st_size or entry['mtime_ns'] != stat.st_mtime_ns:
+                try:
+                    entry = self._build_entry(world_key, stat)
+                except Exception as e:
+                    trace.error("Could not catalog world %s: %s", world_key, e)
+                    continue
+                changed = True
+            entries[world_key] = entry
+
+        changed = changed or entries.keys() != self.entries.keys()
+        self.entries = entries
+        if changed:
+            self._write_manifest()
+
+    def _build_entry(self, world_key, stat):
+        store = open_world_store(world_key)
+        main_entry = next((outline['name'] for outline in store.outlines
+                           if outline and outline.get('main-entry', False)), None)
+        trace.debug("Cataloged world %s", world_key)
+        return {
+            'name': store.world.get('name', 'Unknown World'),
+            'size': stat.st_size,
+            'mtime_ns': stat.st_mtime_ns,
+            'main_entry': main_entry,
+            'location_count': len(store),
+        }
+
+    def _read_manifest(self):
+        try:
+            with open(self.manifest_path, 'r') as f:
+                return json.load(f)
+        except FileNotFoundError:
+            return {}
+        except (ValueError, OSError) as e:
+            trace.warning("Ignoring unreadable world catalog %s: %s", self.manifest_path, e)
+            return {}
+
+    def _write_manifest(self):
+        os.makedirs(os.path.dirname(self.manifest_path), exist_ok=True)
+        temp_path = f"{self.manifest_path}.{os.getpid()}.tmp"
+        try:
+            with open(temp_path, 'w') as f:
+                json.dump(self.entries, f, indent=2)
+            os.replace(temp_path, self.manifest_path)
+        except OSError as e:
+            trace.warning("Could not write world catalog %s: %s", self.manifest_path, e)
+
+
+# One catalog per working directory, as sessions may run from copies of the data
+_catalogs = {}
+_catalogs_lock = threading.Lock()
+
+
+def world_catalog():
+    """Return the WorldCatalog for the data/worlds directory under the current working directory."""
+    directory = os.path.abspath(WORLD_DIRECTORY)
+    catalog = _catalogs.get(directory)
+    if catalog is None:
+        with _catalogs_lock:
+            catalog = _catalogs.setdefault(
+                directory, WorldCatalog(directory, os.path.abspath(CATALOG_PATH)))
+    return catalog
@@ -0,0 +1,38 @@
+# engine/world_overlay.py
+
+from debug_config import DebugConfig
+from engine.location_index import LocationIndex
+
+trace = DebugConfig.tracer('save')
+
+# Keys holding a node's children; an overlay entry only carries the node's own fields
+CHILD_KEYS = ('sublocations', 'rooms')
+
+
+def location_fields(node):
+    """Return a node's own fields, leaving out its sublocations and rooms."""
+    return {key: value for key, value in node.items() if key not in CHILD_KEYS}
+
+
+def apply_location_changes(world_data, changes):
+    """Apply a {location path: fields} overlay to a world's data in place."""
+    if not changes:
+        return world_data
+    index = LocationIndex(world_data)
+    for path, fields in changes.items():
+        entry = index.lookup(path)
+        if entry is None:
+            trace.warning("Overlay names a location missing from the world: %s", path)
+            continue
+        entry.node.update(fields)
+    return world_data
+
+
+def world_overlay(world_data):
+    """Return an overlay holding every node of a world, e.g. to carry a whole world into a save."""
+    index = LocationIndex(world_data)
+    overlay = {}
+    for entry in index.entries.values():
+        if entry.path not in overlay and index.paths.get(id(entry.node)) == entry.path:
+            overlay[entry.path] = location_fields(entry.node)
+    return overlay
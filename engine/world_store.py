@@ -0,0 +1,200 @@
+# engine/world_store.py
+
+import copy
+import json
+import mmap
+import os
+import struct
+import threading
+from collections.abc import Sequence
+from debug_config import DebugConfig
+from engine.data_cache import DataCache
+
+trace = DebugConfig.tracer('world')
+
+WORLD_DIRECTORY = 'data/worlds'
+
+# Compiled worlds are derived from the .json files and rebuilt whenever their source changes
+INDEX_DIRECTORY = os.path.join(WORLD_DIRECTORY, '.index')
+
+# Bump when the compiled layout changes; older files are then recompiled
+STORE_FORMAT_VERSION = 1
+
+MAGIC = b'TAW\x00'
+
+_HEADER = struct.Struct('<4sHQ')
+
+# Keys holding a node's children, and the other keys an outline keeps for indexing and routing
+CHILD_KEYS = ('sublocations', 'rooms')
+OUTLINE_KEYS = ('name', 'paths', 'main-entry')
+
+
+class WorldStoreError(ValueError):
+    pass
+
+
+class WorldStore:
+    """
+    A compiled world file, memory-mapped so only the locations that are read get paged in.
+
+    The file holds a JSON index followed by each top-level location as its own
+    JSON document. The index has the world's other fields, the span of each
+    location and an outline of every node (names, paths and children only), so
+    the whole world can be indexed and routed without loading any location.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        with open(path, 'rb') as f:
+            self.map = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        if len(self.map) < _HEADER.size:
+            raise WorldStoreError(f"{path} is not a compiled world")
+        magic, version, index_length = _HEADER.unpack_from(self.map, 0)
+        if magic != MAGIC or version != STORE_FORMAT_VERSION:
+            raise WorldStoreError(f"{path} is not a version {STORE_FORMAT_VERSION} compiled world")
+
+        index = json.loads(self.map[_HEADER.size:_HEADER.size + index_length])
+        self.source = tuple(index['source'])
+        self.world = index['world']
+        self.spans = index['spans']
+        self.outlines = index['outlines']
+        self.data_offset = _HEADER.size + index_length
+
+    def __len__(self):
+        return len(self.spans)
+
+    def read_location(self, position):
+        """Decode one top-level location; every call returns a new copy."""
+        offset, length = self.spans[position]
+        start = self.data_offset + offset
+        return json.loads(self.map[start:start + length])
+
+    def world_data(self):
+        """Return a new world dict whose locations are read from the store on first use."""
+        world_data = copy.deepcopy(self.world)
+        world_data['locations'] = LazyLocations(self)
+        return world_data
+
+
+class LazyLocations(Sequence):
+    """
+    A world's list of top-level locations, each decoded from its WorldStore on first access.
+
+    A loaded location is private to this list, so a session may change it freely.
+    on_load, if set, is called with each location as it loads.
+    """
+
+    def __init__(self, store):
+        self.store = store
+        self.locations = [None] * len(store)
+        self.on_load = None
+
+    def __len__(self):
+        return len(self.locations)
+
+    def __getitem__(self, position):
+        if isinstance(position, slice):
+            return [self[i] for i in range(*position.indices(len(self)))]
+        position = range(len(self.locations))[position]
+        location = self.locations[position]
+        if location is None:
+            location = self.locations[position] = self.store.read_location(position)
+            trace.debug("Loaded location %s of %s", position, self.store.path)
+            if self.on_load is not None:
+                self.on_load(location)
+        return location
+
+    def is_loaded(self, position):
+        return self.locations[position] is not None
+
+    def loaded(self):
+        """Return the locations loaded so far."""
+        return [location for location in self.locations if location is not None]
+
+    def outline(self, position):
+        """Return a location's outline: its names, paths and children, without loading it."""
+        return self.store.outlines[position]
+
+
+def _outline(node):
+    if not isinstance(node, dict):
+        return None
+    outline = {key: node[key] for key in OUTLINE_KEYS if key in node}
+    for key in CHILD_KEYS:
+        if isinstance(node.get(key), list):
+            outline[key] = [_outline(child) for child in node[key]]
+    return outline
+
+
+def _source_signature(source_path):
+    stat = os.stat(source_path)
+    return (stat.st_size, stat.st_mtime_ns)
+
+
+def compile_world(source_path, index_path):
+    """Write the compiled form of a world's .json file to index_path."""
+    with open(source_path, 'rb') as f:
+        world = json.load(f)
+    locations = world.get('locations', [])
+
+    spans = []
+    blobs = []
+    offset = 0
+    for location in locations:
+        blob = json.dumps(location, separators=(',', ':')).encode('utf-8')
+        spans.append((offset, len(blob)))
+        blobs.append(blob)
+        offset += len(blob)
+
+    index = json.dumps({
+        'source': _source_signature(source_path),
+        'world': {key: value for key, value in world.items() if key != 'locations'},
+        'spans': spans,
+        'outlines': [_outline(location) for location in locations],
+    }, separators=(',', ':')).encode('utf-8')
+
+    os.makedirs(os.path.dirname(index_path), exist_ok=True)
+    temp_path = f"{index_path}.{os.getpid()}.tmp"
+    with open(temp_path, 'wb') as f:
+        f.write(_HEADER.pack(MAGIC, STORE_FORMAT_VERSION, len(index)))
+        f.write(index)
+        for blob in blobs:
+            f.write(blob)
+    os.replace(temp_path, index_path)
+    trace.debug("Compiled %s (%s locations) to %s", source_path, len(locations), index_path)
+
+
+# Absolute source path -> WorldStore, shared by every session in the process
+_stores = {}
+_stores_lock = threading.Lock()
+
+
+def open_world_store(world_name):
+    """
+    Return the WorldStore for a world in data/worlds, compiling it first if it is missing or stale.
+
+    Like DataCache, an opened store is only checked against its source again when
+    DataCache.hot_reload is on.
+    """
+    source_path = os.path.abspath(os.path.join(WORLD_DIRECTORY, f'{world_name}.json'))
+    index_path = os.path.abspath(os.path.join(INDEX_DIRECTORY, f'{world_name}.world'))
+    store = _stores.get(source_path)
+    if store is not None and not DataCache.hot_reload:
+        return store
+    signature = _source_signature(source_path)
+    with _stores_lock:
+        store = _stores.get(source_path)
+        if store is not None and store.source == signature:
+            return store
+
+        store = None
+        if os.path.exists(index_path):
+            try:
+                store = WorldStore(index_path)
+            except (WorldStoreError, ValueError, KeyError) as e:
+                trace.warning("Recompiling %s: %s", index_path, e)
+        if store is None or store.source != signature:
+            compile_world(source_path, index_path)
+            store = WorldStore(index_path)
+        _stores[source_path] = store
+        return store
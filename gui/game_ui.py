@@ -3,13 +3,15 @@
 from PySide6.QtWidgets import QTextEdit, QVBoxLayout, QLabel, QHBoxLayout, QListWidget, QLineEdit, QPushButton, QComboBox, QListWidgetItem, QWidget
 from PySide6.QtCore import Qt, QTimer, Signal, QThread
 from PySide6.QtGui import QFont, QPalette, QColor
-from icecream import ic
+from debug_config import DebugConfig
 import re
 from interfaces import IGameManager, IWorldBuilder, IGameUI
 from utilities import convert_text_to_display
 from engine.worker import Worker
 import threading
 
+trace = DebugConfig.tracer('ui')
+
 
 class GameUI(QWidget, IGameUI):
     ui_ready_to_show = Signal()
@@ -30,9 +32,9 @@ class GameUI(QWidget, IGameUI):
         if not self.game_manager:
             raise ValueError("GameUI requires a GameManager instance.")
         else:
-            ic("GameManager instance set in GameUI:", self.game_manager)
+            trace.debug("GameManager instance set in GameUI: %s", self.game_manager)
         
-        ic("GameUI initialized")
+        trace.debug("GameUI initialized")
 
     def set_game_manager(self, game_manager: IGameManager):
         self.game_manager = game_manager
@@ -44,7 +46,7 @@ class GameUI(QWidget, IGameUI):
         """
         Initialize the UI components for a new game.
         """
-        ic("Initializing UI for a new game")
+        trace.debug("Initializing UI for a new game")
         self.game_text_area.clear()
         self.inventory_list.clear()
         self.command_input.clear()
@@ -56,16 +58,25 @@ class GameUI(QWidget, IGameUI):
         self.game_manager.display_text_signal.connect(self.display_text)
         self.world_builder.display_text_signal.connect(self.display_text)
         self.world_builder.command_processed_signal.connect(self.enable_command_input)
+        self.game_manager.stateReplaced.connect(self.on_state_replaced)
 
     def on_game_loaded(self):
-        ic("Game loaded")
+        trace.debug("Game loaded")
         self.update_quest_log()
         self.ui_ready_to_show.emit()
-        ic("GameUI is now displayed")
+        trace.debug("GameUI is now displayed")
+
+    def on_state_replaced(self):
+        # Same widgets, new game state: clear the old session's text and refresh the lists
+        trace.debug("Game state replaced")
+        self.game_text_area.clear()
+        self.command_input.clear()
+        self.update_ui()
+        self.enable_command_input()
 
     def init_ui(self):
         # Create the main layout
-        ic("Initializing UI")
+        trace.debug("Initializing UI")
         main_layout = QHBoxLayout(self)
         
         # Create the inventory panel
@@ -164,7 +175,7 @@ class GameUI(QWidget, IGameUI):
 
 
     def initialize_drop_down_menu(self):
-        ic("Initializing drop down menu")
+        trace.debug("Initializing drop down menu")
         # Add categories to the drop-down menu
         self.drop_down_menu.addItem("Inventory")
         self.drop_down_menu.addItem("Fast Travel")
@@ -189,9 +200,9 @@ class GameUI(QWidget, IGameUI):
         self.email_selected_signal.emit(item)
 
     def update_ui_from_dropdown(self, index):
-        ic("Updating UI from dropdown")
+        trace.debug("Updating UI from dropdown")
         selected_item = self.drop_down_menu.currentText()
-        ic("Selected item from dropdown:", selected_item)
+        trace.debug("Selected item from dropdown: %s", selected_item)
         self.current_category = selected_item
         
         self.inventory_label.setText(selected_item + " Locations" if selected_item == "Fast Travel" else selected_item)
@@ -226,46 +237,46 @@ class GameUI(QWidget, IGameUI):
 
 
     def populate_inventory(self):
-        ic("Populating inventory")
+        trace.debug("Populating inventory")
         items = self.game_manager.get_inventory_data()
-        ic("Inventory items:, items")
+        trace.debug("Inventory items: %s", items)
         self.inventory_list.clear()  # Clear the list before adding new items
         self.inventory_list.addItem(f"Tokens: {self.game_manager.player_sheet.get_tokens() if self.game_manager.player_sheet else 0}")
         for item_string in items:
             self.inventory_list.addItem(item_string)
-            ic("Item added to inventory list widget:", item_string)
+            trace.debug("Item added to inventory list widget: %s", item_string)
 
     def populate_fast_travel_locations(self):
-        ic("Populating fast travel locations")
+        trace.debug("Populating fast travel locations")
         locations = self.game_manager.get_fast_travel_locations_data()
-        ic("Fast travel locations:", locations)
+        trace.debug("Fast travel locations: %s", locations)
         self.inventory_list.clear()  # Clear the list before adding new items
         for location_string in locations:
             self.inventory_list.addItem(location_string)
-            ic("Location added to fast travel list widget:", location_string)
+            trace.debug("Location added to fast travel list widget: %s", location_string)
 
     def populate_notes(self):
-        ic("Populating notes")
+        trace.debug("Populating notes")
         notes = self.game_manager.get_notes_data()
-        ic("Notes:", notes)
+        trace.debug("Notes: %s", notes)
         self.inventory_list.clear()  # Clear the list before adding new items
         for note_name in notes:
             self.inventory_list.addItem(note_name)
-            ic("Note added to notes list widget:", note_name)
+            trace.debug("Note added to notes list widget: %s", note_name)
 
     def populate_quest_log(self):
-        ic("Populating quest log")
+        trace.debug("Populating quest log")
         quests = self.game_manager.get_quests_data()
-        ic("Quests:", quests)
+        trace.debug("Quests: %s", quests)
         self.inventory_list.clear()  # Clear the list before adding new items
         for quest_string in quests:
             self.inventory_list.addItem(quest_string)
-            ic("Quest added to quest log list widget:", quest_string)
+            trace.debug("Quest added to quest log list widget: %s", quest_string)
 
     def populate_emails(self):
-        ic("Populating emails")
+        trace.debug("Populating emails")
         emails = self.game_manager.get_emails_data()
-        ic("Emails:", emails)
+        trace.debug("Emails: %s", emails)
         self.inventory_list.clear()  # Clear the list before adding new items
         for email_string in emails:
             item = QListWidgetItem(email_string)
@@ -278,9 +289,9 @@ class GameUI(QWidget, IGameUI):
             self.inventory_list.addItem(item)
 
     def process_command(self):
-        ic("Entered process_command", threading.get_ident())
+        trace.debug("Entered process_command %s", threading.get_ident())
         command_text = self.command_input.text().strip().lower()
-        ic("Command text:", command_text)
+        trace.debug("Command text: %s", command_text)
 
         if command_text:  # Check if command_text is not empty
             self.is_command_processing = True
@@ -316,7 +327,7 @@ class GameUI(QWidget, IGameUI):
                 # Emit signal for special commands
                 self.special_command_signal.emit(command_text)
         else:
-            ic("No command entered")
+            trace.debug("No command entered")
             self.command_input.setPlaceholderText("Type a command...")
 
 
@@ -330,9 +341,9 @@ class GameUI(QWidget, IGameUI):
 
 
     def display_item_information(self, item_widget):
-        ic("Displaying item information")
+        trace.debug("Displaying item information")
         selected_text = item_widget.text()
-        ic("Selected item text:", selected_text)
+        trace.debug("Selected item text: %s", selected_text)
 
         # Determine the selected name based on the current category
         if self.current_category == "Quest Log":
@@ -376,15 +387,15 @@ class GameUI(QWidget, IGameUI):
 
     def enable_command_input(self):
         if not self.is_command_processing:
-            ic("From enable_command_input() Enabling command input")
+            trace.debug("From enable_command_input() Enabling command input")
             self.command_input.setEnabled(True)
             self.command_input.setPlaceholderText("Type a command...")
             self.command_input.setFocus()
 
 
     def display_text(self, processed_content):
-        ic("display_text thread ID", threading.get_ident())
-        ic(processed_content)
+        trace.debug("display_text thread ID %s", threading.get_ident())
+        trace.debug("Processed content: %s", processed_content)
 
         # Clear the game text area and apply any necessary styling
         self.game_text_area.clear()
@@ -411,28 +422,28 @@ class GameUI(QWidget, IGameUI):
 
         # Start displaying the chunks from the beginning
         self.display_chunk()
-        ic("Exiting display_text", threading.get_ident())
+        trace.debug("Exiting display_text %s", threading.get_ident())
 
     def display_chunk(self):
-        ic("Entered display_chunk", threading.get_ident())
+        trace.debug("Entered display_chunk %s", threading.get_ident())
         if self.current_chunk_index < len(self.chunks):
             # Get the current chunk to display
             chunk = self.chunks[self.current_chunk_index]
-            ic("Current chunk content:", chunk)
+            trace.debug("Current chunk content: %s", chunk)
             centered_chunk = f'<div style="text-align: center;">{chunk}</div>'
 
             # Display the current chunk
             if self.current_chunk_index > 0:
-                ic("Appending chunk")
+                trace.debug("Appending chunk")
                 current_html = self.game_text_area.toHtml()
                 self.game_text_area.setHtml(current_html + centered_chunk)
             else:
-                ic("Setting chunk")
+                trace.debug("Setting chunk")
                 self.game_text_area.setHtml(centered_chunk)
 
             # Increment the chunk index and set the timer for the next chunk if there are more
             self.current_chunk_index += 1
-            ic("Setting timer")
+            trace.debug("Setting timer")
             if self.current_chunk_index < len(self.chunks):
                 QTimer.singleShot(750, self.display_chunk)  # Set timer for next chunk
             else:
@@ -443,23 +454,23 @@ class GameUI(QWidget, IGameUI):
 
     def finalize_display(self):
         # This method gets called when all chunks have been displayed
-        ic("Finalizing display")
+        trace.debug("Finalizing display")
         self.is_displaying_chunk = False
 
         # Only re-enable the command input if no other command is being processed.
         if not self.is_command_processing:
-            ic("Enabling command input from finalize_display")
+            trace.debug("Enabling command input from finalize_display")
             self.enable_command_input()
 
     def split_into_chunks(self, html_content):
         # Split by paragraphs and unordered lists
-        ic("Splitting into chunks")
+        trace.debug("Splitting into chunks")
         chunks = re.split(r'(</p>|</ul>)', html_content)
-        ic("Chunks:", chunks)
+        trace.debug("Chunks: %s", chunks)
 
         # Re-add the split tags to each chunk and filter out empty strings
         chunks = [chunk + split_tag for chunk, split_tag in zip(chunks[0::2], chunks[1::2]) if chunk]
-        ic("Chunks after filtering:", chunks)
+        trace.debug("Chunks after filtering: %s", chunks)
 
         return chunks
 
@@ -473,7 +484,7 @@ class GameUI(QWidget, IGameUI):
 
 
     def update_ui(self):
-        ic("Updating UI")
+        trace.debug("Updating UI")
         # Determine what type of data to display based on the current selection in the dropdown
         current_selection = self.drop_down_menu.currentText()
         if current_selection == "Quest Log":
@@ -490,6 +501,6 @@ class GameUI(QWidget, IGameUI):
 
     def update_scene_display(self):
         scene_text = self.game_manager.world_builder.build_scene_text()
-        ic("Updating scene display")
-        ic(scene_text)
+        trace.debug("Updating scene display")
+        trace.debug("Scene text: %s", scene_text)
         self.display_text(scene_text)
\ No newline at end of file
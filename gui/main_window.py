@@ -7,6 +7,7 @@ from icecream import ic
 from interfaces import IGameUI
 from gui.game_ui import GameUI
 from engine.game_manager import GameManager
+from engine.save_index import SaveIndex, format_slot
 from intro import IntroAnimation
 from extras.tutorial import Tutorial
 
@@ -252,10 +253,19 @@ class MainWindow(QMainWindow):
     def trigger_save_game(self):
         self.game_ui.game_manager.save_game()
 
+    def end_session(self):
+        # Quitting drops what wasn't saved, so the next start has nothing to recover
+        if self.game_manager:
+            self.game_manager.end_session()
+
     def select_save_file(self):
         self.is_new_game = False
-        filename, _ = QFileDialog.getOpenFileName(self, "Load Game", "save_data/", "Save Files (*.pkl)")
-        if filename:
+        filename = self.prompt_for_save_slot()
+        if filename and self.game_manager and self.game_manager.has_session():
+            # The running game takes the save in place; GameUI refreshes on stateReplaced
+            if not self.game_manager.load_game(filename):
+                ic("Failed to load the game.")
+        elif filename:
             # Create a new game manager instance
             self.game_manager = GameManager(use_ai=self.use_ai)
 
@@ -265,6 +275,33 @@ class MainWindow(QMainWindow):
             else:
                 ic("Failed to load the game.")
 
+    def prompt_for_save_slot(self):
+        # Slots are listed from the save index, so no save is decoded until one is picked
+        slots = SaveIndex().list_slots()
+        browse = "Browse for a save file..."
+        if not slots:
+            return self.browse_for_save_file()
+
+        labels = [format_slot(slot) for _, slot in slots]
+        dialog = QInputDialog(self)
+        dialog.setStyleSheet("""
+            QComboBox { color: black; }
+            QPushButton { color: black; }
+        """)
+        dialog.setWindowTitle("Load Game")
+        dialog.setLabelText("Choose a save:")
+        dialog.setComboBoxItems(labels + [browse])
+        if dialog.exec() != QDialog.Accepted:
+            return None
+        choice = dialog.textValue()
+        if choice == browse:
+            return self.browse_for_save_file()
+        return slots[labels.index(choice)][0]
+
+    def browse_for_save_file(self):
+        filename, _ = QFileDialog.getOpenFileName(self, "Load Game", "save_data/", "Save Files (*.sav *.pkl)")
+        return filename
+
     def initialize_ui_for_loaded_game(self):
         # Initialize world builder and quest tracker
         self.game_manager.initialize_world_builder()
@@ -151,6 +151,10 @@ class IGameUI:
         """Handle the event when the game is loaded."""
         pass
 
+    def on_state_replaced(self):
+        """Refresh the UI after a save was loaded into the running game."""
+        pass
+
     def update_ui(self):
         """Update the entire UI."""
         pass
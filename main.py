@@ -1,7 +1,12 @@
 import sys
+import os
+import json
+import time
+import contextlib
 from PySide6.QtWidgets import QApplication
 import argparse
 from debug_config import DebugConfig
+from engine.data_cache import DataCache
 from gui.main_window import MainWindow
 from utilities import delete_working_files
 
@@ -9,12 +14,59 @@ from utilities import delete_working_files
 parser = argparse.ArgumentParser()
 parser.add_argument('--debug', action='store_true')
 parser.add_argument('--use-ai', action='store_true', help='Enable AI assist feature')
+parser.add_argument('--trace', help='Comma separated trace categories to show (world, quest, ui, ai, save)')
+parser.add_argument('--script', help='Run the commands in this file, one per line, without starting the GUI')
+parser.add_argument('--world', default='OdysseyVR', help='World a --script run starts in')
+parser.add_argument('--output', help='JSON lines file for --script responses (default: stdout)')
+parser.add_argument('--in-place', action='store_true', help='Let a --script run use the real data and save directories')
+parser.add_argument('--hot-reload', action='store_true', help='Re-read cached data files such as quests.json and the worlds when they change')
 args = parser.parse_args()
 debug_on = args.debug
 use_ai = args.use_ai
 
+def run_script():
+    # Imported here so GUI start-up doesn't pay for the headless session
+    from engine.headless import HeadlessGameManager, scratch_directory
+
+    with open(args.script, 'r') as f:
+        commands = [line.strip() for line in f if line.strip() and not line.lstrip().startswith('#')]
+
+    output = open(os.path.abspath(args.output), 'w') if args.output else sys.stdout
+    workspace = contextlib.nullcontext() if args.in_place else scratch_directory()
+    # The engine prints load and save messages; keep them out of the JSON lines
+    with workspace, contextlib.redirect_stdout(sys.stderr):
+        session = HeadlessGameManager('Player', args.world, use_ai)
+        session.add_fast_travel_worlds(session.load_worlds_data())
+
+        total_start = time.perf_counter()
+        for command in commands:
+            start = time.perf_counter()
+            response, messages = session.run_command(command)
+            seconds = time.perf_counter() - start
+            output.write(json.dumps({
+                'command': command,
+                'response': response,
+                'messages': messages,
+                'location': session.player_sheet.location,
+                'seconds': round(seconds, 6),
+            }) + '\n')
+        total_seconds = time.perf_counter() - total_start
+        session.end_session()
+
+    if args.output:
+        output.close()
+    rate = len(commands) / total_seconds if total_seconds else 0.0
+    print(f"{len(commands)} commands in {total_seconds:.3f}s ({rate:.0f} commands/s)", file=sys.stderr)
+
 def main():
     DebugConfig.set_level('DEBUG' if debug_on else 'ERROR')
+    if args.trace:
+        DebugConfig.set_trace_categories(args.trace.split(','))
+    DataCache.hot_reload = args.hot_reload
+
+    if args.script:
+        run_script()
+        return
 
     app = QApplication(sys.argv)
 
@@ -22,6 +74,7 @@ def main():
 
     # Initialize MainWindow without all components
     main_window = MainWindow(use_ai)
+    app.aboutToQuit.connect(main_window.end_session)
 
     # Show the main window
     main_window.show()
@@ -2,25 +2,62 @@
 
 import json
 from typing import Dict
-import pickle
 import os
 from icecream import ic
 import glob
 import re
+import sys
+from functools import lru_cache
+from debug_config import DebugConfig
+from engine.data_cache import DataCache
+from engine.save_format import encode_game_state, decode_game_state, PICKLE_SAVE_EXTENSION
+from engine.world_catalog import world_catalog
+from engine.world_store import open_world_store
 
+trace = DebugConfig.tracer('world')
+
+# Upper bound on distinct names kept by normalize_name's cache
+NAME_CACHE_SIZE = 131072
+
+_LEADING_ARTICLE = re.compile(r'^the\s+', re.IGNORECASE)
+_WHITESPACE = re.compile(r'\s+')
+
+@lru_cache(maxsize=NAME_CACHE_SIZE)
 def normalize_name(name):
-    ic(f"Normalizing name: {name}")
-    normalized_name = re.sub(r'^the\s+', '', name, flags=re.IGNORECASE)
-    normalized_name = re.sub(r'\s+', ' ', normalized_name).strip().lower()
-    ic(f"Normalized name: {normalized_name}")
-    return normalized_name
+    normalized_name = _LEADING_ARTICLE.sub('', name)
+    normalized_name = _WHITESPACE.sub(' ', normalized_name).strip().lower()
+    # Interned so equal names share one object and comparisons short-circuit on identity
+    return sys.intern(normalized_name)
+
+def normalize_world_names(world_data):
+    """
+    Normalize every name in a world in one pass and return a {name: normalized_name} map.
+
+    Covers locations, sublocations, rooms and the NPCs, items and containers in them,
+    including NPC and container inventories. Called at load time so later lookups
+    hit normalize_name's cache.
+    """
+    names = {}
+    nodes = list(world_data.get('locations', []))
+    while nodes:
+        node = nodes.pop()
+        if not isinstance(node, dict):
+            continue
+        name = node.get('name')
+        if isinstance(name, str) and name not in names:
+            names[name] = normalize_name(name)
+        for key in ('sublocations', 'rooms', 'npcs', 'items', 'containers', 'inventory', 'contains'):
+            children = node.get(key)
+            if isinstance(children, list):
+                nodes.extend(children)
+    trace.debug("Normalized %s world names", len(names))
+    return names
 
 # Function to load text from a JSON file
 def load_text(file_name: str) -> Dict:
     path = f'data/dialog/{file_name}.json'
     try:
-        with open(path, 'r', encoding='utf-8') as file:
-            return json.load(file)
+        return DataCache.load(path)
     except FileNotFoundError:
         ic(f"The file {file_name}.json was not found.")
     except json.JSONDecodeError:
@@ -34,9 +71,8 @@ def load_text(file_name: str) -> Dict:
 def load_json(file_name: str, key) -> Dict:
     path = f'data/{file_name}.json'
     try:
-        with open(path, 'r') as file:
-            data = json.load(file)
-            return data.get(key, []) 
+        # Parsed once per process; callers get their own copy to change
+        return DataCache.load(path).get(key, [])
     except FileNotFoundError:
         ic(f"The file {file_name}.json was not found.")
     except json.JSONDecodeError as e:
@@ -45,106 +81,64 @@ def load_json(file_name: str, key) -> Dict:
         ic(f"An error occurred: {e}")
     return []
 
-def save_game_data(state, filename='savegame.pkl'):
+def save_game_data(state, filename='savegame.sav', writer=None):
+    # The state is serialized here, so the save is a snapshot of the game as it is now.
+    # With a SaveWriter it reaches the disk on its thread; either way the file is replaced atomically.
+    # Returns the size of the save, or None if it couldn't be written.
     save_directory = "save_data"
     if not os.path.exists(save_directory):
         os.makedirs(save_directory)
 
     file_path = os.path.join(save_directory, filename)
     try:
-        with open(file_path, 'wb') as f:
-            pickle.dump(state, f)
+        data = encode_game_state(state)
+        if writer:
+            writer.replace(file_path, data)
+        else:
+            write_file_atomically(file_path, data)
         print(f"Game saved successfully as {file_path}.")
+        return len(data)
     except Exception as e:
         print(f"An error occurred while saving the game: {e}")
+    return None
 
-    # Ensure the location is a dictionary with the 'world' key
-    if isinstance(state['player_sheet'].location, dict) and 'world' in state['player_sheet'].location:
-        world_name = state['player_sheet'].location['world']
-        print(f"Saving world data for: {world_name}")
-        working_world_path = f'data/worlds/working_{world_name}.json'
-        try:
-            with open(working_world_path, 'w') as f:
-                json.dump(state['world_data'], f, indent=4)
-            print(f"Working world data saved successfully as {working_world_path}.")
-        except Exception as e:
-            print(f"An error occurred while saving the working world data: {e}")
-    else:
-        print(f'Player location: {state["player_sheet"].location}')
-        print("The player's location is not in the correct format. Cannot save world data.")
-
+def write_file_atomically(path, data, mode='wb', temp_suffix='.tmp'):
+    """Write data to a temporary file beside path, then rename it over path."""
+    temp_path = f"{path}{temp_suffix}"
+    with open(temp_path, mode) as f:
+        f.write(data)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(temp_path, path)
 
 # Function to load game state
-def load_game_data(filename='savegame.pkl'):
+def load_game_data(filename='savegame.sav'):
+    # Saves from before the binary format are .pkl pickles, which decode_game_state migrates
     try:
         with open(filename, 'rb') as f:
-            return pickle.load(f)
+            return decode_game_state(f.read(), allow_pickle=filename.endswith(PICKLE_SAVE_EXTENSION))
     except FileNotFoundError:
         ic("Save file not found.")
     except Exception as e:
         ic(f"An error occurred while loading the game: {e}")
     return None
 
-def create_working_world_data(world_name):
-    # Construct the file paths for base and working world data
-    base_world_path = f'data/worlds/{world_name}.json'
-    working_world_path = f'data/worlds/working_{world_name}.json'
-    
-    # Load the base world data
-    with open(base_world_path, 'r') as f:
-        base_world_data = json.load(f)
-    
-    # Create a working copy for this game session
-    with open(working_world_path, 'w') as f:
-        json.dump(base_world_data, f)
-
 def load_working_world_data(world_name):
-    # Directly use the provided world name to construct file paths
-    working_world_path = f'data/worlds/working_{world_name}.json'
-    saved_game_path = f'save_data/working_{world_name}_savegame.pkl'
-    print(f"Loading working world data for {world_name}.")
-
-
-    # Check if there's a saved game specific to this world
-    if os.path.exists(saved_game_path):
-        print(f"Found saved game state for {world_name}.")
-        # Load the saved game state
-        try:
-            with open(saved_game_path, 'rb') as f:
-                saved_state = pickle.load(f)
-                print(f"Loaded saved game state for {world_name}.")
-                return saved_state['world_data']
-        except Exception as e:
-            print(f"Error loading saved game state for {world_name}: {e}")
-
-    # If no specific saved game state, create a new working copy
-    if not os.path.exists(working_world_path):
-        # If the working world file does not exist, create it from the base file
-        create_working_world_data(world_name)
-
-    # Load the working world data into memory and return it
-    with open(working_world_path, 'r') as f:
-        return json.load(f)
-    
-def load_all_worlds():
-    world_directory = 'data/worlds'
-    world_data = {}
-    ic("Loading world data...")
+    """
+    Return a fresh, mutable copy of a world as shipped in data/worlds.
+
+    The world is read from its memory-mapped WorldStore, and each top-level location
+    is decoded only when something first reads it.
+    """
+    return open_world_store(world_name).world_data()
 
+def load_all_worlds():
+    # {world key: display name}, read from the world catalog instead of parsing every world
     try:
-        for filename in os.listdir(world_directory):
-            ic(filename)
-            if filename.endswith('.json') and not filename.startswith('working_'):
-                world_name = filename[:-5]  # Remove .json extension
-                ic(world_name)
-                with open(os.path.join(world_directory, filename), 'r') as file:
-                    data = json.load(file)
-                    world_display_name = data.get("name", "Unknown World")
-                    world_data[world_name] = world_display_name
+        return world_catalog().names()
     except Exception as e:
         ic(f"An error occurred while loading world data: {e}")
-
-    return world_data
+    return {}
 
 def convert_text_to_display(text):
     # Convert newlines in the text to HTML paragraph tags
@@ -157,8 +151,8 @@ def convert_text_to_display(text):
     return html_content
 
 def delete_working_files():
-    # Delete all working files "working_*.json"
-    working_world_path = f'data/worlds/working_*.json'
+    # Worlds are no longer copied to disk; this clears working_* files left by older versions
+    working_world_path = f'data/worlds/working_*'
     working_world_files = glob.glob(working_world_path)
     for file in working_world_files:
         os.remove(file)